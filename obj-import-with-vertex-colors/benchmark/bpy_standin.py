@@ -0,0 +1,496 @@
+"""
+Minimal stand-in for the parts of bpy (and mathutils, bmesh, bpy_extras, progress_report) used by import_obj,
+so that it can be benchmarked outside of Blender.
+Mesh data is kept in numpy arrays, so foreach_get/foreach_set cost about what they do in Blender,
+but validate(), the ngon tessellation and the bmesh un-tessellation do (almost) nothing.
+
+Call install() before importing import_obj, and reset() before each import.
+"""
+
+import os
+import sys
+import types
+
+import numpy as np
+
+
+class _Item:
+    """
+    An item of a _Collection (like a MeshPolygon), reading and writing its properties in the collection arrays.
+    """
+    __slots__ = ("_collection", "_index")
+
+    def __init__(self, collection, index):
+        object.__setattr__(self, "_collection", collection)
+        object.__setattr__(self, "_index", index)
+
+    def __getattr__(self, name):
+        getter = self._collection.getters.get(name)
+        if getter is not None:
+            return getter(self._index)
+        value = self._collection.props[name][self._index]
+        return value.item() if value.ndim == 0 else value
+
+    def __setattr__(self, name, value):
+        self._collection.props[name][self._index] = value
+
+
+class _Collection:
+    """
+    Like a bpy_prop_collection: items with the properties given as {name: (dtype, width)},
+    and computed ones given as {name: getter(index)}.
+    """
+
+    def __init__(self, props, getters=None):
+        self.spec = props
+        self.props = {name: np.zeros((0, width) if width > 1 else 0, dtype=dtype)
+                      for name, (dtype, width) in props.items()}
+        self.getters = getters or {}
+        self._len = 0
+
+    def __len__(self):
+        return self._len
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self._len
+        if not 0 <= index < self._len:
+            raise IndexError(index)
+        return _Item(self, index)
+
+    def __iter__(self):
+        return (_Item(self, index) for index in range(self._len))
+
+    def add(self, count):
+        for name, (dtype, width) in self.spec.items():
+            added = np.zeros((count, width) if width > 1 else count, dtype=dtype)
+            self.props[name] = np.concatenate((self.props[name], added))
+        self._len += count
+
+    def foreach_set(self, name, seq):
+        values = self.props[name].reshape(-1)
+        values[:] = np.asarray(seq, dtype=values.dtype).reshape(-1)
+
+    def foreach_get(self, name, seq):
+        values = self.props[name].reshape(-1)
+        if isinstance(seq, np.ndarray):
+            seq[:] = values
+        else:
+            seq[:] = type(seq)(seq.typecode, values.tolist())
+
+
+class _Layers(list):
+    """
+    Mesh layers (vertex colors, uv layers...) made by new() with a data collection of the given properties,
+    one item per loop or per polygon.
+    """
+
+    def __init__(self, mesh, props, domain="loops", on_new=None):
+        super().__init__()
+        self._mesh = mesh
+        self._props = props
+        self._domain = domain
+        self._on_new = on_new
+
+    def new(self, name=""):
+        data = _Collection(self._props() if callable(self._props) else self._props)
+        data.add(len(getattr(self._mesh, self._domain)))
+        layer = types.SimpleNamespace(name=name, data=data)
+        self.append(layer)
+        if self._on_new is not None:
+            self._on_new(name)
+        return layer
+
+
+class _Attributes(_Layers):
+    """
+    Mesh attributes (Blender 2.92+), only color ones (with their sRGB values since Blender 3.4).
+    """
+    DOMAINS = {'POINT': "vertices", 'CORNER': "loops", 'FACE': "polygons"}
+
+    def __init__(self, mesh):
+        super().__init__(mesh, lambda: dict({"color": (np.float32, 4)},
+                                            **({"color_srgb": (np.float32, 4)} if _version() >= (3, 4, 0) else {})))
+
+    def new(self, name, type, domain):
+        self._domain = self.DOMAINS[domain]
+        layer = super().new(name)
+        layer.data_type = type
+        layer.domain = domain
+        return layer
+
+
+class Mesh:
+    def __init__(self, name):
+        self.name = name
+        self.users = 0
+        self.materials = []
+        self.vertices = _Collection({"co": (np.float32, 3)})
+        self.loops = _Collection({"vertex_index": (np.int32, 1), "normal": (np.float32, 3)})
+        self.polygons = _Collection({"loop_start": (np.int32, 1), "loop_total": (np.int32, 1),
+                                     "use_smooth": (np.bool_, 1), "material_index": (np.int32, 1)},
+                                    getters={"vertices": self._polygon_vertices,
+                                             "loop_indices": self._polygon_loop_indices})
+        self.edges = self._new_edges()
+        self.uv_layers = _Layers(self, {"uv": (np.float32, 2)})
+        # Blender 2.79 uv textures (one image per polygon) come with a uv layer.
+        self.uv_textures = _Layers(self, {"image": (object, 1)}, "polygons", self.uv_layers.new)
+        self.vertex_colors = _Layers(self, lambda: {"color": (np.float32, 4 if _version() >= (2, 80, 0) else 3)})
+        self.vertex_layers_float = _Layers(self, {"value": (np.float32, 1)}, "vertices")
+        if _version() >= (2, 92, 0):
+            self.attributes = _Attributes(self)
+        if _version() >= (3, 2, 0):
+            self.color_attributes = types.SimpleNamespace(active_color=None)
+        self.show_edge_sharp = False
+        self.use_auto_smooth = False
+
+    def _new_edges(self):
+        return _Collection({"vertices": (np.int32, 2), "use_edge_sharp": (np.bool_, 1)},
+                           getters={"key": self._edge_key})
+
+    def _polygon_loop_indices(self, index):
+        loop_start = int(self.polygons.props["loop_start"][index])
+        return range(loop_start, loop_start + int(self.polygons.props["loop_total"][index]))
+
+    def _polygon_vertices(self, index):
+        return self.loops.props["vertex_index"][self._polygon_loop_indices(index)].tolist()
+
+    def _edge_key(self, index):
+        return tuple(sorted(self.edges.props["vertices"][index].tolist()))
+
+    def create_normals_split(self):
+        pass
+
+    def validate(self, clean_customdata=True):
+        return False
+
+    def update(self, calc_edges=False):
+        """
+        With calc_edges, add the edges of the polygons (keeping the existing ones).
+        """
+        loop_v = self.loops.props["vertex_index"]
+        if not (calc_edges or not len(self.edges)) or not len(loop_v):
+            return
+        loop_start = self.polygons.props["loop_start"]
+        loop_next = np.arange(1, len(loop_v) + 1)
+        loop_next[loop_start + self.polygons.props["loop_total"] - 1] = loop_start
+        edges = np.concatenate((np.stack((loop_v, loop_v[loop_next]), axis=1), self.edges.props["vertices"]))
+        edges.sort(axis=1)
+        edges = np.unique(edges, axis=0)
+        self.edges = self._new_edges()
+        self.edges.add(len(edges))
+        self.edges.props["vertices"][:] = edges
+
+    def normals_split_custom_set(self, normals):
+        self.loops.props["normal"][:] = np.asarray(normals, dtype=np.float32).reshape(-1, 3)
+
+
+class Material:
+    def __init__(self, name):
+        self.name = name
+        self.texture_slots = _TextureSlots()
+        self.raytrace_mirror = types.SimpleNamespace()
+        self.raytrace_transparency = types.SimpleNamespace()
+        self._props = {}
+
+    def __getitem__(self, key):
+        return self._props[key]
+
+    def __setitem__(self, key, value):
+        self._props[key] = value
+
+    def get(self, key, default=None):
+        return self._props.get(key, default)
+
+
+class _TextureSlots(list):
+    def add(self):
+        slot = types.SimpleNamespace(offset=types.SimpleNamespace(x=0.0, y=0.0, z=0.0),
+                                     scale=types.SimpleNamespace(x=1.0, y=1.0, z=1.0))
+        self.append(slot)
+        return slot
+
+
+class Texture:
+    def __init__(self, name, type):
+        self.name = name
+        self.type = type
+        self.image = None
+
+
+class Image:
+    def __init__(self, name, filepath=""):
+        self.name = name
+        self.filepath = filepath
+
+
+class Curve:
+    def __init__(self, name, type):
+        self.name = name
+        self.type = type
+        self.splines = _Splines()
+
+
+class _Splines(list):
+    def new(self, type):
+        # A spline starts with a point.
+        spline = types.SimpleNamespace(type=type, points=_Collection({"co": (np.float32, 4)}))
+        spline.points.add(1)
+        self.append(spline)
+        return spline
+
+
+class Object:
+    # Setting matrix_world sets location (rotation and scale are not handled).
+    @property
+    def matrix_world(self):
+        return self._matrix_world
+
+    @matrix_world.setter
+    def matrix_world(self, matrix):
+        self._matrix_world = matrix
+        self.location = Vector(matrix.rows[:3, 3])
+
+    # Setting data counts the users of the data.
+    @property
+    def data(self):
+        return self._data
+
+    @data.setter
+    def data(self, data):
+        if getattr(self, "_data", None) is not None:
+            self._data.users -= 1
+        self._data = data
+        if data is not None:
+            data.users += 1
+
+    def __init__(self, name, data):
+        self.name = name
+        self.data = data
+        self.matrix_world = Matrix()
+        self.scale = (1.0, 1.0, 1.0)
+        self.select = False
+        self.vertex_groups = _VertexGroups()
+        self.bound_box = [(0.0, 0.0, 0.0)] * 8
+        self._props = {}
+
+    def __getitem__(self, key):
+        return self._props[key]
+
+    def __setitem__(self, key, value):
+        self._props[key] = value
+
+    def get(self, key, default=None):
+        return self._props.get(key, default)
+
+
+class _VertexGroups(list):
+    def new(self, name="Group"):
+        group = types.SimpleNamespace(name=name, indices=[])
+        group.add = lambda indices, weight, type: group.indices.extend(indices)
+        self.append(group)
+        return group
+
+
+class _DataCollection(list):
+    """
+    Like bpy.data.meshes..., new() makes the name unique the way Blender does.
+    """
+
+    def __init__(self, factory):
+        super().__init__()
+        self._factory = factory
+        self._names = set()
+
+    def new(self, *args, **kwargs):
+        item = self._factory(*args, **kwargs)
+        name = item.name
+        number = 0
+        while item.name in self._names:
+            number += 1
+            item.name = "%s.%03d" % (name, number)
+        self._names.add(item.name)
+        self.append(item)
+        return item
+
+    def load(self, filepath, check_existing=False):
+        return self.new(os.path.basename(filepath), filepath)
+
+    def remove(self, item, do_unlink=True):
+        # Like Blender, an object is unlinked from the scene, and no longer uses its data.
+        super().remove(item)
+        self._names.discard(item.name)
+        scene_objects = sys.modules["bpy"].context.scene.objects
+        if item in scene_objects:
+            scene_objects.remove(item)
+        if isinstance(item, Object):
+            item.data = None
+
+
+class _SceneObjects(list):
+    def link(self, ob):
+        self.append(ob)
+        return ob
+
+
+class Scene:
+    def __init__(self):
+        self.objects = _SceneObjects()
+
+    def update(self):
+        pass
+
+
+def _version():
+    return sys.modules["bpy"].app.version
+
+
+def reset():
+    """
+    Start again with an empty scene and no data.
+    """
+    bpy = sys.modules["bpy"]
+    bpy.data = types.SimpleNamespace(meshes=_DataCollection(Mesh),
+                                     materials=_DataCollection(Material),
+                                     textures=_DataCollection(Texture),
+                                     images=_DataCollection(Image),
+                                     objects=_DataCollection(Object),
+                                     curves=_DataCollection(Curve))
+    bpy.context.scene = Scene()
+
+
+class Vector(tuple):
+    def __new__(cls, seq):
+        return tuple.__new__(cls, (float(value) for value in seq))
+
+    def __mul__(self, factor):
+        return Vector(value * factor for value in self)
+
+
+class Matrix:
+    def __init__(self, rows=None):
+        self.rows = np.identity(4) if rows is None else np.array(rows, dtype=float)
+
+    @classmethod
+    def Translation(cls, vector):
+        matrix = cls()
+        matrix.rows[:3, 3] = tuple(vector)[:3]
+        return matrix
+
+    def __matmul__(self, other):
+        if isinstance(other, Matrix):
+            return Matrix(self.rows.dot(other.rows))
+        return Vector(self.rows.dot(tuple(other)[:3] + (1.0,))[:3])
+
+    __mul__ = __matmul__
+
+    def __getitem__(self, index):
+        return self.rows[index]
+
+    def copy(self):
+        return Matrix(self.rows)
+
+
+def unpack_list(list_of_tuples):
+    return [value for values in list_of_tuples for value in values]
+
+
+def load_image(imagepath, dirname="", place_holder=False, recursive=False, ncase_cmp=True,
+               convert_callback=None, verbose=False, relpath=None, check_existing=False, force_reload=False):
+    images = sys.modules["bpy"].data.images
+    for path in (imagepath, os.path.join(dirname, imagepath)):
+        if os.path.exists(path):
+            return images.new(os.path.basename(path), path)
+    if recursive:
+        basename = os.path.basename(imagepath)
+        for root, _dirs, files in os.walk(dirname):
+            if basename in files:
+                return images.new(basename, os.path.join(root, basename))
+    if place_holder:
+        return images.new(os.path.basename(imagepath), imagepath)
+    return None
+
+
+def ngon_tessellate(from_data, indices, fix_loops=True):
+    """
+    Fan triangulation, instead of Blender's polyfill.
+    """
+    return [(0, index, index + 1) for index in range(1, len(indices) - 1)]
+
+
+class BMesh:
+    def __init__(self):
+        self.verts = []
+        self.edges = types.SimpleNamespace(get=lambda verts, fallback=None: None)
+
+    def from_mesh(self, me):
+        self.verts = list(range(len(me.vertices)))
+
+    def to_mesh(self, me):
+        pass
+
+    def free(self):
+        pass
+
+
+class ProgressReport:
+    def __init__(self, wm=None):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+    def enter_substeps(self, nbr, msg=""):
+        pass
+
+    def leave_substeps(self, msg=""):
+        pass
+
+    def step(self, msg="", nbr=1):
+        pass
+
+
+class CyclesShaderWrapper:
+    """
+    Accepts (and ignores) all node setup calls.
+    """
+
+    def __init__(self, material):
+        self.material = material
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: None
+
+
+def _add_module(name, **attrs):
+    module = types.ModuleType(name)
+    module.__dict__.update(attrs)
+    sys.modules[name] = module
+    return module
+
+
+def install(version=(2, 79, 0)):
+    """
+    Register the stand-in modules in sys.modules (as Blender version), returns the bpy one.
+    """
+    bpy = _add_module("bpy",
+                      app=types.SimpleNamespace(version=version),
+                      context=types.SimpleNamespace(window_manager=None, scene=None),
+                      ops=types.SimpleNamespace(object=types.SimpleNamespace(
+                          select_all=types.SimpleNamespace(poll=lambda: False))))
+    reset()
+
+    _add_module("mathutils", Vector=Vector, Matrix=Matrix)
+    _add_module("bpy_extras",
+                io_utils=_add_module("bpy_extras.io_utils", unpack_list=unpack_list),
+                image_utils=_add_module("bpy_extras.image_utils", load_image=load_image),
+                mesh_utils=_add_module("bpy_extras.mesh_utils", ngon_tessellate=ngon_tessellate))
+    _add_module("bmesh", new=BMesh, ops=types.SimpleNamespace(dissolve_edges=lambda bm, edges, use_verts: None))
+    _add_module("modules",
+                cycles_shader_compat=_add_module("modules.cycles_shader_compat",
+                                                 CyclesShaderWrapper=CyclesShaderWrapper))
+    _add_module("progress_report", ProgressReport=ProgressReport, ProgressReportSubstep=ProgressReport)
+    return bpy
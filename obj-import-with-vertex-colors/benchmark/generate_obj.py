@@ -0,0 +1,155 @@
+"""
+Write synthetic OBJ/MTL files to benchmark import_obj with.
+
+Usage:
+python generate_obj.py out.obj --verts 1000000 --objects 10 --ngon-share 0.1 --continuation-share 0.01
+"""
+
+import argparse
+import os
+import random
+
+
+def generate_obj(filepath,
+                 *,
+                 nbr_verts=10000,
+                 face_arity=4,
+                 ngon_share=0.0,
+                 ngon_max=8,
+                 use_colors=True,
+                 use_normals=True,
+                 use_uvs=True,
+                 use_faces=True,
+                 nbr_smooth_groups=0,
+                 nbr_objects=1,
+                 nbr_materials=2,
+                 use_textures=False,
+                 use_negative_indices=False,
+                 continuation_share=0.0,
+                 seed=0,
+                 ):
+    """
+    Write an obj file (and its mtl file next to it) with nbr_verts vertices split between nbr_objects
+    objects (alternating 'o' and 'g' statements), each with about half as many faces as vertices.
+    Faces have face_arity vertices, except a ngon_share of them with 5 to ngon_max.
+    Vertices have a color with use_colors, and each one has its own normal and uv with use_normals and use_uvs.
+    Without use_faces, only the v statements are written (a point cloud).
+    The objects use nbr_materials materials (with a placeholder image for half of them with use_textures)
+    and nbr_smooth_groups smooth groups. With use_negative_indices, faces use indices relative to the end of
+    the vertex lists. A continuation_share of the v and f statements are broken in two lines ending with '\\'.
+    Returns the number of vertices and faces written.
+    """
+    rnd = random.Random(seed)
+    dirname = os.path.dirname(os.path.abspath(filepath))
+    mtl_name = os.path.splitext(os.path.basename(filepath))[0] + ".mtl"
+
+    with open(os.path.join(dirname, mtl_name), 'w') as f:
+        for material_index in range(nbr_materials):
+            f.write("newmtl material%d\n" % material_index)
+            f.write("Kd %.4f %.4f %.4f\nKs 0.5 0.5 0.5\nNs 50\nillum 2\n" %
+                    (rnd.random(), rnd.random(), rnd.random()))
+            if use_textures and not material_index % 2:
+                image_name = "material%d.png" % material_index
+                f.write("map_Kd %s\n" % image_name)
+                with open(os.path.join(dirname, image_name), 'wb') as image:
+                    image.write(b"\x89PNG\r\n\x1a\n")
+            f.write("\n")
+
+    def write_statement(f, tag, items):
+        if continuation_share and rnd.random() < continuation_share:
+            f.write("%s %s \\\n%s\n" % (tag, " ".join(items[:2]), " ".join(items[2:])))
+        else:
+            f.write("%s %s\n" % (tag, " ".join(items)))
+
+    nbr_faces = 0
+    with open(filepath, 'w') as f:
+        f.write("# Synthetic obj file written by generate_obj.py\n")
+        f.write("mtllib %s\n" % mtl_name)
+        vert_start = 0
+        for object_index in range(nbr_objects):
+            vert_end = nbr_verts * (object_index + 1) // nbr_objects
+            object_verts = vert_end - vert_start
+            f.write("%s object%d\n" % ("g" if object_index % 2 else "o", object_index))
+
+            for _ in range(object_verts):
+                items = ["%.6f" % rnd.uniform(-10.0, 10.0) for _ in range(3)]
+                if use_colors:
+                    items.extend("%.4f" % rnd.random() for _ in range(3))
+                write_statement(f, "v", items)
+                if use_uvs:
+                    f.write("vt %.5f %.5f\n" % (rnd.random(), rnd.random()))
+                if use_normals:
+                    f.write("vn %.4f %.4f %.4f\n" % (rnd.uniform(-1.0, 1.0), rnd.uniform(-1.0, 1.0), 1.0))
+
+            if nbr_materials:
+                f.write("usemtl material%d\n" % (object_index % nbr_materials))
+            if nbr_smooth_groups:
+                f.write("s %d\n" % (object_index % nbr_smooth_groups + 1))
+
+            for _ in range(object_verts // 2 if use_faces else 0):
+                arity = face_arity
+                if ngon_share and rnd.random() < ngon_share:
+                    arity = rnd.randint(5, ngon_max)
+                if arity > object_verts:
+                    break
+                items = []
+                for vidx in rnd.sample(range(vert_start, vert_end), arity):
+                    # Indices of vertices, uvs and normals are the same, as each vertex has its own.
+                    index = "%d" % ((vidx - vert_end) if use_negative_indices else (vidx + 1))
+                    if use_uvs and use_normals:
+                        items.append("%s/%s/%s" % (index, index, index))
+                    elif use_uvs:
+                        items.append("%s/%s" % (index, index))
+                    elif use_normals:
+                        items.append("%s//%s" % (index, index))
+                    else:
+                        items.append(index)
+                write_statement(f, "f", items)
+                nbr_faces += 1
+
+            if nbr_smooth_groups:
+                f.write("s off\n")
+            vert_start = vert_end
+
+    return nbr_verts, nbr_faces
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a synthetic obj file (and its mtl file).")
+    parser.add_argument("filepath")
+    parser.add_argument("--verts", type=int, default=10000)
+    parser.add_argument("--face-arity", type=int, default=4)
+    parser.add_argument("--ngon-share", type=float, default=0.0)
+    parser.add_argument("--no-colors", action="store_true")
+    parser.add_argument("--no-normals", action="store_true")
+    parser.add_argument("--no-uvs", action="store_true")
+    parser.add_argument("--no-faces", action="store_true")
+    parser.add_argument("--smooth-groups", type=int, default=0)
+    parser.add_argument("--objects", type=int, default=1)
+    parser.add_argument("--materials", type=int, default=2)
+    parser.add_argument("--textures", action="store_true")
+    parser.add_argument("--negative-indices", action="store_true")
+    parser.add_argument("--continuation-share", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    nbr_verts, nbr_faces = generate_obj(args.filepath,
+                                        nbr_verts=args.verts,
+                                        face_arity=args.face_arity,
+                                        ngon_share=args.ngon_share,
+                                        use_colors=not args.no_colors,
+                                        use_normals=not args.no_normals,
+                                        use_uvs=not args.no_uvs,
+                                        use_faces=not args.no_faces,
+                                        nbr_smooth_groups=args.smooth_groups,
+                                        nbr_objects=args.objects,
+                                        nbr_materials=args.materials,
+                                        use_textures=args.textures,
+                                        use_negative_indices=args.negative_indices,
+                                        continuation_share=args.continuation_share,
+                                        seed=args.seed)
+    print("Wrote %r: %i vertices, %i faces" % (args.filepath, nbr_verts, nbr_faces))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Benchmark import_obj outside of Blender (see bpy_standin.py), on synthetic obj files (see generate_obj.py)
+or given ones, reporting the time, throughput and peak memory of each import phase.
+
+Usage:
+python run_benchmark.py --verts 100000 1000000 --objects 10 --ngon-share 0.1 --memory
+python run_benchmark.py --obj model.obj --option use_parallel_parse=True --log benchmark.jsonl
+python run_benchmark.py --verts 10000000 --no-faces --no-normals --no-uvs --option use_point_cloud=True
+python run_benchmark.py --verts 1000000 --no-faces --option chunk_max_verts=100000
+"""
+
+import argparse
+import ast
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+
+import bpy_standin
+from generate_obj import generate_obj
+
+bpy = bpy_standin.install()
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import import_obj  # noqa: E402 (needs the stand-in modules)
+
+
+def run_import(filepath, load_options, use_tracemalloc=False, verbose=False):
+    """
+    Import filepath (in a new empty scene), returns the import_obj.ImportProfile report.
+    """
+    bpy_standin.reset()
+    profile = import_obj.ImportProfile(use_tracemalloc=use_tracemalloc)
+    with contextlib.redirect_stdout(sys.stdout if verbose else io.StringIO()):
+        import_obj.load(bpy.context, filepath, profile=profile, **load_options)
+    return profile.report()
+
+
+def print_report(report, memory_report=None):
+    counts = report["counts"]
+    print("%s: %i vertices, %i faces (%i ngons, %i invalid), %i colored vertices, %i objects" %
+          (report["filepath"], counts.get("vertices", 0), counts.get("faces", 0), counts.get("ngons", 0),
+           counts.get("invalid_faces", 0), counts.get("colored_vertices", 0), counts.get("objects", 0)))
+    print("  %-14s %6s %10s %14s %14s %12s" % ("phase", "calls", "time (s)", "vertices/s", "faces/s", "peak (MiB)"))
+    for name, phase in sorted(report["phases"].items(), key=lambda item: -item[1]["time"]):
+        time = max(phase["time"], 1e-9)
+        peak = "" if memory_report is None else "%.1f" % (memory_report["phases"][name]["peak_memory"] / (1 << 20))
+        print("  %-14s %6i %10.4f %14.0f %14.0f %12s" % (name, phase["calls"], phase["time"],
+                                                         counts.get("vertices", 0) / time,
+                                                         counts.get("faces", 0) / time, peak))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark import_obj on synthetic or given obj files.")
+    parser.add_argument("--obj", nargs="*", default=[], help="obj files to import instead of generated ones")
+    parser.add_argument("--verts", type=int, nargs="*", default=[100000],
+                        help="number of vertices of each generated file")
+    parser.add_argument("--face-arity", type=int, default=4)
+    parser.add_argument("--ngon-share", type=float, default=0.0)
+    parser.add_argument("--no-colors", action="store_true")
+    parser.add_argument("--no-normals", action="store_true")
+    parser.add_argument("--no-uvs", action="store_true")
+    parser.add_argument("--no-faces", action="store_true")
+    parser.add_argument("--smooth-groups", type=int, default=0)
+    parser.add_argument("--objects", type=int, default=1)
+    parser.add_argument("--materials", type=int, default=2)
+    parser.add_argument("--textures", action="store_true")
+    parser.add_argument("--negative-indices", action="store_true")
+    parser.add_argument("--continuation-share", type=float, default=0.0)
+    parser.add_argument("--option", action="append", default=[],
+                        help="import_obj.load() option as name=value (a Python literal), can be repeated")
+    parser.add_argument("--repeat", type=int, default=1, help="import each file this many times, keep the fastest")
+    parser.add_argument("--memory", action="store_true",
+                        help="import once more tracing memory allocations (much slower) to report peak memory")
+    parser.add_argument("--log", help="append the reports to this JSON-lines file")
+    parser.add_argument("--version", default="2.79.0", help="Blender version the stand-in pretends to be")
+    parser.add_argument("--verbose", action="store_true", help="show the importer output")
+    args = parser.parse_args()
+
+    bpy.app.version = tuple(int(number) for number in args.version.split("."))
+    load_options = {}
+    for option in args.option:
+        name, _sep, value = option.partition("=")
+        load_options[name] = ast.literal_eval(value)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        filepaths = list(args.obj)
+        for nbr_verts in ([] if args.obj else args.verts):
+            filepath = os.path.join(tmp_dir, "generated_%i.obj" % nbr_verts)
+            generate_obj(filepath,
+                         nbr_verts=nbr_verts,
+                         face_arity=args.face_arity,
+                         ngon_share=args.ngon_share,
+                         use_colors=not args.no_colors,
+                         use_normals=not args.no_normals,
+                         use_uvs=not args.no_uvs,
+                         use_faces=not args.no_faces,
+                         nbr_smooth_groups=args.smooth_groups,
+                         nbr_objects=args.objects,
+                         nbr_materials=args.materials,
+                         use_textures=args.textures,
+                         use_negative_indices=args.negative_indices,
+                         continuation_share=args.continuation_share)
+            filepaths.append(filepath)
+
+        for filepath in filepaths:
+            reports = [run_import(filepath, load_options, verbose=args.verbose) for _ in range(args.repeat)]
+            report = min(reports, key=lambda report: report["phases"]["import"]["time"])
+            memory_report = None
+            if args.memory:
+                memory_report = run_import(filepath, load_options, use_tracemalloc=True, verbose=args.verbose)
+            print_report(report, memory_report)
+
+            if args.log:
+                report["options"] = load_options
+                if memory_report is not None:
+                    report["peak_memory"] = {name: phase["peak_memory"]
+                                             for name, phase in memory_report["phases"].items()}
+                with open(args.log, 'a') as f:
+                    f.write(json.dumps(report, sort_keys=True) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -32,18 +32,176 @@ http://wiki.blender.org/index.php/Scripts/Manual/Import/wavefront_obj
 """
 
 import array
+import contextlib
+import fnmatch
+import hashlib
+import json
+import mmap
 import os
+import re
+import tempfile
 import time
+import tracemalloc
+import numpy as np
 import bpy
-import copy
 import mathutils
 from bpy_extras.io_utils import unpack_list
 from bpy_extras.image_utils import load_image
 
 from progress_report import ProgressReport, ProgressReportSubstep
 
-verts_with_vcol = []
-verts_vcols = []
+# Size of the chunks the obj file is read in, see iter_obj_chunks().
+OBJ_CHUNK_SIZE = 1 << 24
+
+# First line starting with 'v' and holding a decimal separator, see get_float_func().
+FLOAT_FORMAT_RE = re.compile(rb'\n[ \t\r\x0b\x0c]*v[^\n]*?[.,]')
+
+# A run of single-line v/vn/vt statements (each line preceded by its newline), see iter_obj_lines().
+VEC_RUN_RE = re.compile(rb'(?:\nv[nt]? [^\n\\]*(?=\n|\Z))+')
+VEC_LINE_RES = {prefix: re.compile(b'\n' + prefix + rb'[^\n]*') for prefix in (b'v ', b'vn ', b'vt ')}
+
+# usemtl/mtllib/s lines, see scan_obj_materials().
+MATERIAL_LINE_RE = re.compile(rb'^[ \t]*(?:usemtl|mtllib|s)(?:[ \t\r][^\n]*)?$', re.M)
+
+# Statements whose byte offsets are kept in an ObjIndex, v/vt/vn lines starting with spaces (rare, counted
+# apart from the others), and the suffix and format version of the index sidecar file, see get_obj_index().
+OBJ_INDEX_LINE_RE = re.compile(rb'\n[ \t]*(o|g|usemtl|s|mtllib)(?=[ \t\r\n]|\Z)[^\n]*')
+OBJ_INDEX_INDENTED_VEC_RE = re.compile(rb'\n[ \t]+(v|vt|vn)[ \t]')
+OBJ_INDEX_SUFFIX = ".objindex"
+OBJ_INDEX_VERSION = 1
+
+# Parallel parsing (see parse_obj_file()): smallest byte range given to a process,
+# state of a range left to be resolved from the previous ones,
+# and offset of the negative indices that could not be resolved in a range.
+PARALLEL_MIN_RANGE = 1 << 23
+INHERITED = -1
+REL_INDEX_BIAS = 1 << 62
+
+# FaceData.flags bits: a polyline ('l'), a Blender-invalid ngon (using a same edge more than once),
+# a face with normal indices, a face with uv indices.
+FACE_POLYLINE = 1
+FACE_INVALID_BLENPOLY = 2
+FACE_USE_NOR = 4
+FACE_USE_TEX = 8
+# The numpy arrays of a FaceData.
+FACE_ARRAYS = ("loop_v", "loop_vt", "loop_vn", "loop_start", "loop_total",
+               "material", "smooth_group", "object", "flags")
+
+# The mtl statements of image maps, the bytes read from the start of an image file when looking for it
+# (see probe_image_file()) and the number of threads doing it.
+MTL_IMAGE_LINE_IDS = {b'map_ka', b'map_ks', b'map_kd', b'map_ke', b'map_bump', b'bump', b'map_d', b'map_tr',
+                      b'map_disp', b'disp', b'map_refl', b'refl'}
+IMAGE_HEADER_SIZE = 1 << 12
+IMAGE_LOAD_THREADS = 8
+
+# Start of the newmtl lines, see get_mtl_materials().
+NEWMTL_LINE_RE = re.compile(rb'^[ \t]*newmtl(?=\s|$)', re.M | re.I)
+# Custom property of the materials holding their material_key().
+MATERIAL_KEY_PROP = "import_obj_material_key"
+# Custom properties of the objects made with use_update (see load()): the absolute path of the file,
+# the name of the object in it (numbered after the first one of a name) and the mesh_hash() of its mesh.
+OBJECT_SOURCE_PROP = "import_obj_source"
+OBJECT_KEY_PROP = "import_obj_key"
+OBJECT_HASH_PROP = "import_obj_hash"
+
+# Parse cache (see save_parse_cache()): default directory and size limit, and version of the cache files content.
+PARSE_CACHE_DIR = os.path.join(tempfile.gettempdir(), "blender_obj_parse_cache")
+PARSE_CACHE_MAX_SIZE = 4 << 30
+PARSE_CACHE_VERSION = 1
+
+
+class ImportProfile:
+    """
+    Wall time and peak traced memory of each phase of an import, and counts of what was imported.
+
+    A phase entered several times (like "mesh", once per object) adds up its times and keeps its biggest
+    peak_memory, the most traced memory (in bytes) it needed above what was allocated when it started.
+    Memory is only traced with use_tracemalloc, inside tracing(); before Python 3.9 (no tracemalloc.reset_peak)
+    a peak may come from before the phase started.
+    """
+    __slots__ = ("use_tracemalloc", "info", "phases", "calls", "counts", "_stack")
+
+    def __init__(self, use_tracemalloc=True):
+        self.use_tracemalloc = use_tracemalloc
+        self.info = {}
+        self.phases = {}
+        self.calls = {}
+        self.counts = {}
+        self._stack = []
+
+    @contextlib.contextmanager
+    def tracing(self):
+        """
+        Trace memory allocations (if use_tracemalloc and they are not traced already) in this context.
+        """
+        start = self.use_tracemalloc and not tracemalloc.is_tracing()
+        if start:
+            tracemalloc.start()
+        try:
+            yield
+        finally:
+            if start:
+                tracemalloc.stop()
+
+    def _traced_memory(self):
+        # Also gives the peak so far to the enclosing phase, before it is reset for the next one.
+        current, peak = tracemalloc.get_traced_memory()
+        if self._stack:
+            self._stack[-1][1] = max(self._stack[-1][1], peak)
+        if hasattr(tracemalloc, "reset_peak"):
+            tracemalloc.reset_peak()
+        return current, peak
+
+    @contextlib.contextmanager
+    def phase(self, name, per_call=False):
+        """
+        Measure the code run in this context as (part of) phase name.
+        Yields the dict of this call's time and peak_memory, kept in calls[name] with per_call,
+        so that the caller can add to it.
+        """
+        record = {}
+        use_tracemalloc = self.use_tracemalloc and tracemalloc.is_tracing()
+        if use_tracemalloc:
+            current, _peak = self._traced_memory()
+            self._stack.append([current, current])
+        time_start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record["time"] = time.perf_counter() - time_start
+            record["peak_memory"] = 0
+            if use_tracemalloc:
+                start, peak = self._stack.pop()
+                peak = max(peak, self._traced_memory()[1])
+                record["peak_memory"] = max(0, peak - start)
+
+            phase = self.phases.setdefault(name, {"time": 0.0, "calls": 0, "peak_memory": 0})
+            phase["time"] += record["time"]
+            phase["calls"] += 1
+            phase["peak_memory"] = max(phase["peak_memory"], record["peak_memory"])
+            if per_call:
+                self.calls.setdefault(name, []).append(record)
+
+    def count(self, name, nbr=1):
+        self.counts[name] = self.counts.get(name, 0) + nbr
+
+    def report(self):
+        """
+        Returns everything measured, as a dict that can be written as JSON.
+        """
+        report = dict(self.info)
+        report["phases"] = self.phases
+        report["objects"] = self.calls.get("mesh", [])
+        report["counts"] = self.counts
+        return report
+
+    def write_log(self, log_path):
+        """
+        Append the report as one line of JSON to the file log_path.
+        """
+        with open(log_path, 'a') as f:
+            f.write(json.dumps(self.report(), sort_keys=True) + "\n")
+
 
 def line_value(line_split):
     """
@@ -61,46 +219,247 @@ def line_value(line_split):
         return b' '.join(line_split[1:])
 
 
-def obj_image_load(context_imagepath_map, line, DIR, recursive, relpath):
+class ImageSearchIndex:
+    """
+    The files in a directory tree, by lowercase name, to find images the way load_image(recursive=True)
+    does without walking the tree again for each one.
     """
-    Mainly uses comprehensiveImageLoad
-    But we try all space-separated items from current line when file is not found with last one
+    __slots__ = ("dir_mtimes", "files")
+
+    def __init__(self, root):
+        self.dir_mtimes = {}
+        self.files = {}
+        for dirpath, _dirnames, filenames in os.walk(root):
+            self.dir_mtimes[dirpath] = os.stat(dirpath).st_mtime_ns
+            for filename in filenames:
+                self.files.setdefault(filename.lower(), os.path.join(dirpath, filename))
+
+    def is_current(self):
+        """
+        Whether no file or directory was added, removed or renamed in the tree since it was indexed.
+        """
+        try:
+            return all(os.stat(dirpath).st_mtime_ns == mtime for dirpath, mtime in self.dir_mtimes.items())
+        except OSError:
+            return False
+
+    def find(self, imagepath):
+        return self.files.get(os.path.basename(imagepath).lower())
+
+
+# Image search indexes by root directory, kept between imports, see get_image_search_index().
+image_search_indexes = {}
+
+
+def get_image_search_index(root):
+    """
+    Returns the ImageSearchIndex of root, only walking it again when its content changed.
+    """
+    index = image_search_indexes.get(root)
+    if index is None or not index.is_current():
+        index = image_search_indexes[root] = ImageSearchIndex(root)
+    return index
+
+
+def find_image_file(line, DIR, search_index=None):
+    """
+    Returns the path of the image file of a map_* mtl line, or None if it can't be found.
+    We try all space-separated items from current line when file is not found with last one
     (users keep generating/using image files with spaces in a format that does not support them, sigh...)
     Also tries to replace '_' with ' ' for Max's exporter replaces spaces with underscores.
+    Each of these paths is looked for in DIR, then by its name anywhere below DIR if a search_index
+    (an ImageSearchIndex of DIR) is given.
     """
     filepath_parts = line.split(b' ')
-    image = None
     for i in range(-1, -len(filepath_parts), -1):
         imagepath = os.fsdecode(b" ".join(filepath_parts[i:]))
-        image = context_imagepath_map.get(imagepath, ...)
-        if image is ...:
-            image = load_image(imagepath, DIR, recursive=recursive, relpath=relpath)
-            if image is None and "_" in imagepath:
-                image = load_image(imagepath.replace("_", " "), DIR, recursive=recursive, relpath=relpath)
-            if image is not None:
-                context_imagepath_map[imagepath] = image
-                break;
-
-    if image is None:
-        imagepath = os.fsdecode(filepath_parts[-1])
-        image = load_image(imagepath, DIR, recursive=recursive, place_holder=True, relpath=relpath)
-        context_imagepath_map[imagepath] = image
+        for path in (imagepath, imagepath.replace("_", " ")) if "_" in imagepath else (imagepath,):
+            image_file = os.path.join(DIR, path)
+            if os.path.isfile(image_file):
+                return image_file
+            if search_index is not None:
+                image_file = search_index.find(path)
+                if image_file is not None:
+                    return image_file
+    return None
+
+
+def probe_image_file(image_file):
+    """
+    Returns the identity of image_file: its real path, size and modification time,
+    so that a same file reached through different paths is loaded once.
+    Also reads its header (and asks the system to read ahead the rest), so that loading it is fast.
+    Returns None if it can't be read.
+    """
+    try:
+        image_file = os.path.realpath(image_file)
+        with open(image_file, 'rb') as f:
+            st = os.fstat(f.fileno())
+            f.read(IMAGE_HEADER_SIZE)
+            if hasattr(os, "posix_fadvise"):
+                os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_WILLNEED)
+    except OSError:
+        return None
+    return image_file, st.st_size, st.st_mtime_ns
+
+
+def load_images(context_imagepath_map, lines, DIR, recursive, relpath):
+    """
+    Load the images of the given map_* mtl lines, in context_imagepath_map by line.
+    The image files are found and read (see find_image_file() and probe_image_file()) in a pool of threads,
+    then Blender images are created here, one per file (also kept in context_imagepath_map, by identity).
+    A placeholder image is made for the files not found, one per name.
+    """
+    import concurrent.futures
 
+    lines = [line for line in dict.fromkeys(lines) if line not in context_imagepath_map]
+    if not lines:
+        return
+    search_index = get_image_search_index(DIR) if recursive else None
+
+    def find_image(line):
+        image_file = find_image_file(line, DIR, search_index)
+        return image_file, None if image_file is None else probe_image_file(image_file)
+
+    if len(lines) > 1:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=IMAGE_LOAD_THREADS) as executor:
+            found_images = list(executor.map(find_image, lines))
+    else:
+        found_images = [find_image(lines[0])]
+
+    for line, (image_file, image_key) in zip(lines, found_images):
+        if image_key is None:
+            imagepath = os.fsdecode(line.split(b' ')[-1])
+            image = context_imagepath_map.get(imagepath)
+            if image is None:
+                image = context_imagepath_map[imagepath] = load_image(imagepath, DIR, place_holder=True,
+                                                                      relpath=relpath)
+        else:
+            image = context_imagepath_map.get(image_key)
+            if image is None:
+                image = context_imagepath_map[image_key] = load_image(image_file, DIR, relpath=relpath)
+        context_imagepath_map[line] = image
+
+
+def obj_image_load(context_imagepath_map, line, DIR, recursive, relpath):
+    """
+    Returns the image of a map_* mtl line, loading it if it is not in context_imagepath_map yet (see load_images()).
+    """
+    load_images(context_imagepath_map, [line], DIR, recursive, relpath)
+    return context_imagepath_map[line]
+
+
+class MtlMaterial:
+    """
+    A material definition of an mtl file: its newmtl line and name, and the lines that follow it
+    (stripped, without empty lines and comments), only split into lines when first needed.
+    """
+    __slots__ = ("newmtl_line", "name", "_data", "_lines")
+
+    def __init__(self, data):
+        self.newmtl_line, _sep, self._data = data.partition(b'\n')
+        self.newmtl_line = self.newmtl_line.strip()
+        self.name = line_value(self.newmtl_line.split())
+        self._lines = None
+
+    @property
+    def lines(self):
+        if self._lines is None:
+            self._lines = tuple(line for line in (line.strip() for line in self._data.split(b'\n'))
+                                if line and not line.startswith(b'#'))
+            self._data = None
+        return self._lines
+
+
+# Materials of the mtl files read so far, by absolute path, see get_mtl_materials().
+mtl_cache = {}
+
+
+def get_mtl_materials(mtlpath):
+    """
+    Returns the MtlMaterial of each newmtl statement of the mtl file mtlpath, in order.
+    They are kept between imports (in mtl_cache), as long as the file keeps the same size and modification time.
+    """
+    mtlpath = os.path.abspath(mtlpath)
+    st = os.stat(mtlpath)
+    cached = mtl_cache.get(mtlpath)
+    if cached is not None and cached[:2] == (st.st_size, st.st_mtime_ns):
+        return cached[2]
+
+    with open(mtlpath, 'rb') as mtl:
+        data = mtl.read()
+    newmtl_starts = [match.start() for match in NEWMTL_LINE_RE.finditer(data)]
+    materials = [MtlMaterial(data[start:end]) for start, end in zip(newmtl_starts, newmtl_starts[1:] + [len(data)])]
+    mtl_cache[mtlpath] = (st.st_size, st.st_mtime_ns, materials)
+    return materials
+
+
+def iter_mtl_lines(mtlpath, unique_materials):
+    """
+    Yields the lines of the mtl file mtlpath, only keeping the newmtl line of the materials not in
+    unique_materials (or not created yet): the rest of their definition is skipped without being read line by line.
+    """
+    for material in get_mtl_materials(mtlpath):
+        yield material.newmtl_line
+        if unique_materials.get(material.name):
+            yield from material.lines
+
+
+def material_key(name, mtl_materials, options):
+    """
+    Returns a key identifying the Blender material create_materials() makes for the material name
+    from its mtl_materials (the MtlMaterial of each of its definitions) and the import options it depends on.
+    """
+    key = hashlib.sha1(repr(options).encode())
+    key.update(name or b'')
+    for mtl_material in mtl_materials:
+        key.update(b'\n'.join((mtl_material.newmtl_line,) + mtl_material.lines) + b'\n')
+    return key.hexdigest()
+
+
+def material_diffuse_image(material):
+    """
+    Returns the image of the (last) diffuse color texture of material made by create_materials(), if any.
+    """
+    image = None
+    for mtex in material.texture_slots:
+        if mtex is not None and mtex.use_map_color_diffuse and getattr(mtex.texture, "image", None) is not None:
+            image = mtex.texture.image
     return image
 
 
+def scan_mtl_image_lines(mtlpath, unique_materials):
+    """
+    Returns the map_* lines of the materials of unique_materials in mtlpath, as create_materials() reads them.
+    """
+    lines = []
+    for line in iter_mtl_lines(mtlpath, unique_materials):
+        line = line.strip()
+        line_split = line.split()
+        if len(line_split) > 1 and line_split[0].lower() in MTL_IMAGE_LINE_IDS:
+            lines.append(line)
+    return lines
+
+
 def create_materials(filepath, relpath,
                      material_libs, unique_materials, unique_material_images,
-                     use_image_search, use_cycles, float_func):
+                     use_image_search, use_cycles, float_func, profile=None, context_imagepath_map=None,
+                     use_material_reuse=False):
     """
     Create all the used materials in this obj,
     assign colors and images to the materials from all referenced material libs
+    (images already in context_imagepath_map, see load_images(), are not loaded again).
+    With use_material_reuse, a material made by an earlier import from the same definition
+    (see material_key()) is used instead of making a new one.
     """
+    if profile is None:
+        profile = ImportProfile(use_tracemalloc=False)
     DIR = os.path.dirname(filepath)
     context_material_vars = set()
 
     # Don't load the same image multiple times
-    context_imagepath_map = {}
+    if context_imagepath_map is None:
+        context_imagepath_map = {}
 
     cycles_material_wrap_map = {}
 
@@ -119,7 +478,8 @@ def create_materials(filepath, relpath,
             curr_token.append(token)
 
         # Absolute path - c:\.. etc would work here
-        image = obj_image_load(context_imagepath_map, line, DIR, use_image_search, relpath)
+        with profile.phase("images"):
+            image = obj_image_load(context_imagepath_map, line, DIR, use_image_search, relpath)
 
         texture = bpy.data.textures.new(name=type, type='IMAGE')
         if image is not None:
@@ -259,16 +619,46 @@ def create_materials(filepath, relpath,
         material_libs.add(temp_mtl)
     del temp_mtl
 
+    if use_material_reuse:
+        mtl_materials = {}
+        for libname in sorted(material_libs):
+            mtlpath = os.path.join(DIR, libname)
+            if os.path.exists(mtlpath):
+                for mtl_material in get_mtl_materials(mtlpath):
+                    mtl_materials.setdefault(mtl_material.name, []).append(mtl_material)
+        key_options = (DIR, relpath, use_image_search, use_cycles, float_func is float)
+        reusable_materials = {ma.get(MATERIAL_KEY_PROP): ma for ma in bpy.data.materials}
+
     # Create new materials
+    new_materials = {}
     for name in unique_materials:  # .keys()
         if name is not None:
-            ma = unique_materials[name] = bpy.data.materials.new(name.decode('utf-8', "replace"))
+            if use_material_reuse:
+                key = material_key(name, mtl_materials.get(name, ()), key_options)
+                ma = reusable_materials.get(key)
+                if ma is not None:
+                    unique_materials[name] = ma
+                    unique_material_images[name] = material_diffuse_image(ma)
+                    continue
+
+            ma = unique_materials[name] = new_materials[name] = bpy.data.materials.new(name.decode('utf-8', "replace"))
             unique_material_images[name] = None  # assign None to all material images to start with, add to later.
+            if use_material_reuse:
+                ma[MATERIAL_KEY_PROP] = key
             if use_cycles:
                 from modules import cycles_shader_compat
                 ma_wrap = cycles_shader_compat.CyclesShaderWrapper(ma)
                 cycles_material_wrap_map[ma] = ma_wrap
 
+    # Find and read all the images used by these materials at once.
+    with profile.phase("images"):
+        image_lines = []
+        for libname in sorted(material_libs):
+            mtlpath = os.path.join(DIR, libname)
+            if os.path.exists(mtlpath):
+                image_lines.extend(scan_mtl_image_lines(mtlpath, new_materials))
+        load_images(context_imagepath_map, image_lines, DIR, use_image_search, relpath)
+
 
     # XXX Why was this needed? Cannot find any good reason, and adds stupid empty matslot in case we do not separate
     #     mesh (see T44947).
@@ -293,8 +683,7 @@ def create_materials(filepath, relpath,
             # print('\t\tloading mtl: %e' % mtlpath)
             context_material = None
             context_mat_wrap = None
-            mtl = open(mtlpath, 'rb')
-            for line in mtl:  # .readlines():
+            for line in iter_mtl_lines(mtlpath, new_materials):
                 line = line.strip()
                 if not line or line.startswith(b'#'):
                     continue
@@ -361,7 +750,7 @@ def create_materials(filepath, relpath,
                         context_material.use_raytrace = True
 
                     context_material_name = line_value(line_split)
-                    context_material = unique_materials.get(context_material_name)
+                    context_material = new_materials.get(context_material_name)
                     if use_cycles and context_material is not None:
                         context_mat_wrap = cycles_material_wrap_map[context_material]
                     context_material_vars.clear()
@@ -526,22 +915,75 @@ def create_materials(filepath, relpath,
                                                 context_material_name, img_data, line, 'refl')
                     else:
                         print("\t%r:%r (ignored)" % (filepath, line))
-            mtl.close()
 
 
-def split_mesh(verts_loc, faces, unique_materials, filepath, SPLIT_OB_OR_GROUP):
+def crop_to_box(verts_loc, verts_col, faces, vertex_groups, box_min, box_max, matrix=None, use_loose_verts=True):
+    """
+    Keep the faces (and lines) whose vertices are all inside the axis-aligned box from box_min to box_max,
+    of the positions transformed by the (4, 4) array matrix if given, and the vertices they use,
+    along with those of no face inside the box with use_loose_verts. Only the kept vertices are copied.
+    Returns verts_loc, verts_col, faces and vertex_groups, with the vertices renumbered in their order.
+    """
+    verts_loc = np.asarray(verts_loc)
+    used_verts = np.sort(faces.loop_v)
+    used_verts = used_verts[np.append(True, used_verts[1:] != used_verts[:-1])] if len(used_verts) else used_verts
+    if use_loose_verts:
+        verts = np.arange(len(verts_loc))
+    else:
+        verts = used_verts[(used_verts >= 0) & (used_verts < len(verts_loc))]
+
+    co = verts_loc[verts]
+    inside = np.ones(len(verts), dtype=bool)
+    for axis in range(3):
+        if matrix is None:
+            values = co[:, axis]
+        else:
+            values = co.dot(matrix[axis, :3]) + matrix[axis, 3]
+        inside &= (values >= box_min[axis]) & (values <= box_max[axis])
+    del co
+
+    def vert_positions(indices):
+        # Positions in verts of indices, and whether they are vertices inside the box.
+        if not len(verts):
+            return np.zeros(len(indices), dtype=np.int64), np.zeros(len(indices), dtype=bool)
+        positions = np.minimum(np.searchsorted(verts, indices), len(verts) - 1)
+        return positions, inside[positions] & (verts[positions] == indices)
+
+    _positions, loop_inside = vert_positions(faces.loop_v)
+    loop_face = np.repeat(np.arange(len(faces)), faces.loop_total)
+    face_keep = np.bincount(loop_face[~loop_inside], minlength=len(faces)) == 0
+    del loop_face, loop_inside
+    faces = faces.subset(np.flatnonzero(face_keep))
+
+    if use_loose_verts:
+        verts = verts[inside]
+    else:
+        verts = np.sort(faces.loop_v)
+        verts = verts[np.append(True, verts[1:] != verts[:-1])] if len(verts) else verts
+    inside = np.ones(len(verts), dtype=bool)
+    faces.loop_v = vert_positions(faces.loop_v)[0].astype(np.int32)
+
+    vertex_groups_crop = {}
+    for group_name, group_indices in vertex_groups.items():
+        positions, is_kept = vert_positions(np.asarray(group_indices, dtype=np.int64))
+        vertex_groups_crop[group_name] = positions[is_kept].tolist()
+
+    return verts_loc[verts], verts_col[verts] if len(verts_col) else verts_col, faces, vertex_groups_crop
+
+
+def split_mesh(verts_loc, verts_col, faces, unique_materials, filepath, SPLIT_OB_OR_GROUP):
     """
-    Takes vert_loc and faces, and separates into multiple sets of
-    (verts_loc, faces, unique_materials, dataname)
+    Takes vert_loc, verts_col and faces, and separates into multiple sets of
+    (verts_loc, verts_col, faces, unique_materials, dataname)
     """
 
     filename = os.path.splitext((os.path.basename(filepath)))[0]
 
-    if not SPLIT_OB_OR_GROUP or not faces:
-        use_verts_nor = any((False if f[1] is ... else True) for f in faces)
-        use_verts_tex = any((False if f[2] is ... else True) for f in faces)
+    if not SPLIT_OB_OR_GROUP or not len(faces):
+        use_verts_nor = bool(np.any(faces.flags & FACE_USE_NOR))
+        use_verts_tex = bool(np.any(faces.flags & FACE_USE_TEX))
         # use the filename for the object name since we aren't chopping up the mesh.
-        return [(verts_loc, faces, unique_materials, filename, use_verts_nor, use_verts_tex)]
+        return [(verts_loc, verts_col, faces, unique_materials, filename, use_verts_nor, use_verts_tex)]
 
     def key_to_name(key):
         # if the key is a tuple, join it to make a string
@@ -550,56 +992,357 @@ def split_mesh(verts_loc, faces, unique_materials, filepath, SPLIT_OB_OR_GROUP):
         else:
             return key.decode('utf-8', 'replace')
 
-    # Return a key that makes the faces unique.
-    face_split_dict = {}
-
-    oldkey = -1  # initialize to a value that will never match the key
-
-    global verts_vcols
-    verts_vcols_split = []
-
-    for face in faces:
-        key = face[5]
-
-        if oldkey != key:
-            # Check the key has changed.
-            (verts_split, faces_split, unique_materials_split, vert_remap,
-             use_verts_nor, use_verts_tex) = face_split_dict.setdefault(key, ([], [], {}, {}, [], []))
-            oldkey = key
+    # Only when every vertex has a color, else they can not be matched.
+    use_verts_col = (len(verts_col) == len(verts_loc))
+
+    def first_used(codes):
+        # The distinct codes, in the order of their first face.
+        codes, first_face = np.unique(codes, return_index=True)
+        return codes[np.argsort(first_face)]
+
+    # Group the faces by object (in the order objects are first used), keeping their order within an object.
+    object_codes = first_used(faces.object)
+    object_rank = np.empty(len(faces.object_names), dtype=np.int64)
+    object_rank[object_codes] = np.arange(len(object_codes))
+    face_rank = object_rank[faces.object]
+    faces = faces.subset(np.argsort(face_rank, kind='stable'))
+    face_rank.sort()
+    loop_rank = np.repeat(face_rank, faces.loop_total)
+
+    # Remap verts to a new vert list per object, all at once: each distinct (object, vertex) pair
+    # in the order it is first used gets a new index, made local by subtracting the object's first one.
+    nbr_verts = max(len(verts_loc), int(faces.loop_v.max()) + 1)
+    loop_keys = loop_rank * nbr_verts + faces.loop_v
+    keys, first_loop, loop_key_index = np.unique(loop_keys, return_index=True, return_inverse=True)
+    key_order = np.argsort(first_loop)
+    key_new_index = np.empty(len(keys), dtype=np.int64)
+    key_new_index[key_order] = np.arange(len(keys))
+    vert_indices = keys[key_order] % nbr_verts
+    object_vert_start = np.searchsorted(keys[key_order] // nbr_verts, np.arange(len(object_codes)))
+    faces.loop_v = (key_new_index[loop_key_index.ravel()] - object_vert_start[loop_rank]).astype(np.int32)
+    del loop_keys, keys, first_loop, loop_key_index, key_order, key_new_index
+
+    object_face_start = np.searchsorted(face_rank, np.arange(len(object_codes) + 1))
+    object_vert_start = np.append(object_vert_start, len(vert_indices))
+
+    split = []
+    for rank, object_code in enumerate(object_codes.tolist()):
+        faces_split = faces.subset(np.arange(object_face_start[rank], object_face_start[rank + 1]))
+        object_vert_indices = vert_indices[object_vert_start[rank]:object_vert_start[rank + 1]]
+        verts_split = verts_loc[object_vert_indices]
+        verts_col_split = verts_col[object_vert_indices] if use_verts_col else verts_col[:0]
+
+        unique_materials_split = {}
+        for material_code in first_used(faces_split.material).tolist():
+            matname = faces.material_names[material_code]
+            if matname:
+                unique_materials_split[matname] = unique_materials[matname]
 
-        face_vert_loc_indices = face[0]
+        split.append((verts_split, verts_col_split, faces_split, unique_materials_split,
+                      key_to_name(faces.object_names[object_code]),
+                      bool(np.any(faces_split.flags & FACE_USE_NOR)), bool(np.any(faces_split.flags & FACE_USE_TEX))))
 
-        if not use_verts_nor and face[1] is not ...:
-            use_verts_nor.append(True)
+    return split
 
-        if not use_verts_tex and face[2] is not ...:
-            use_verts_tex.append(True)
 
-        # Remap verts to new vert list and add where needed
-        set_vcols = (len(verts_vcols) == len(verts_loc))
-        for enum, i in enumerate(face_vert_loc_indices):
-            map_index = vert_remap.get(i)
-            if map_index is None:
-                map_index = len(verts_split)
-                vert_remap[i] = map_index  # set the new remapped index so we only add once and can reference next time.
-                verts_split.append(verts_loc[i])  # add the vert to the local verts
-                if set_vcols:
-                    verts_vcols_split.append(verts_vcols[i])
+def edge_keys(vidx1, vidx2, nbr_verts):
+    """
+    Returns an int64 key for each (vidx1, vidx2) edge, the same whatever the order of its vertices.
+    """
+    vidx1 = vidx1.astype(np.int64)
+    vidx2 = vidx2.astype(np.int64)
+    return np.minimum(vidx1, vidx2) * nbr_verts + np.maximum(vidx1, vidx2)
 
-            face_vert_loc_indices[enum] = map_index  # remap to the local index
 
-            matname = face[3]
-            if matname and matname not in unique_materials_split:
-                unique_materials_split[matname] = unique_materials[matname]
+def grid_cell_keys(co, cell_size):
+    """
+    Number the cells of size cell_size of a grid over the (N, 3) positions co row by row, returns the number
+    of the cell of each position (an int64 array), the numbers to add to get those of the next cells along
+    x, y and z, and the cell size, doubled as many times as needed for the grid to have less than 2**63 cells.
+    """
+    co_min = co.min(axis=0)
+    extent = (co.max(axis=0) - co_min).astype(np.float64).tolist()
+    while True:
+        nbr_cells_xyz = [int(axis_extent / cell_size) + 1 for axis_extent in extent]
+        if nbr_cells_xyz[0] * nbr_cells_xyz[1] * nbr_cells_xyz[2] < (1 << 63):
+            break
+        cell_size *= 2.0
+    cells = np.floor((co - co_min) / cell_size).astype(np.int64)
+    cell_strides = np.array((nbr_cells_xyz[1] * nbr_cells_xyz[2], nbr_cells_xyz[2], 1), dtype=np.int64)
+    return cells @ cell_strides, cell_strides, cell_size
+
+
+def weld_vertex_groups(co, tolerance):
+    """
+    Group the (N, 3) positions co closer than tolerance, returns for each one the index of the first of its group.
+    Positions are sorted by the cell of size tolerance holding them (see grid_cell_keys(), so that the
+    neighbor cells of sorted positions are also sorted), and pairs of positions are looked for in each
+    cell and in its 13 neighbor ones of higher numbers (a pair in the other 13 is found from the other side).
+    Groups are then made by giving each position the smallest index of its pairs, with pointer jumping,
+    until nothing changes (a few passes for a few copies of a vertex).
+    A tolerance of 0 only groups positions that are the same.
+    """
+    nbr_verts = len(co)
+    if not tolerance:
+        # Adding 0 turns -0.0 into 0.0, the same position.
+        _positions, first_vert, position_index = np.unique(co + 0.0, axis=0, return_index=True, return_inverse=True)
+        return first_vert[position_index.ravel()]
+    keys, cell_strides, _cell_size = grid_cell_keys(co, tolerance)
+    order = np.argsort(keys, kind='stable')
+    keys = keys[order]
+    cell_start = np.flatnonzero(np.append(True, keys[1:] != keys[:-1]))
+    cell_keys = keys[cell_start]
+    cell_total = np.diff(np.append(cell_start, nbr_verts))
+
+    pairs_v1 = []
+    pairs_v2 = []
+    offsets = [(x, y, z) for x in (-1, 0, 1) for y in (-1, 0, 1) for z in (-1, 0, 1)]
+    for offset in offsets[len(offsets) // 2:]:
+        neighbor_keys = keys + np.array(offset, dtype=np.int64) @ cell_strides
+        cell = np.searchsorted(cell_keys, neighbor_keys)
+        np.minimum(cell, len(cell_keys) - 1, out=cell)
+        sorted_verts = np.flatnonzero(cell_keys[cell] == neighbor_keys)
+        cell = cell[sorted_verts]
+        # Each vertex with each one of that cell.
+        total = cell_total[cell]
+        v1 = order[np.repeat(sorted_verts, total)]
+        v2 = order[np.repeat(cell_start[cell] - (np.cumsum(total) - total), total) + np.arange(len(v1))]
+        is_pair = (v1 < v2) if offset == (0, 0, 0) else (v1 != v2)
+        is_pair &= np.square(co[v1] - co[v2]).sum(axis=1) <= tolerance * tolerance
+        pairs_v1.append(v1[is_pair])
+        pairs_v2.append(v2[is_pair])
+    del keys, order, neighbor_keys, cell, sorted_verts, total, v1, v2, is_pair
+
+    group_first_vert = np.arange(nbr_verts)
+    pairs_v1 = np.concatenate(pairs_v1)
+    pairs_v2 = np.concatenate(pairs_v2)
+    if not len(pairs_v1):
+        return group_first_vert
+    # Both ways, sorted by first vertex to take the smallest index of the second ones of each.
+    pairs_v1, pairs_v2 = np.concatenate((pairs_v1, pairs_v2)), np.concatenate((pairs_v2, pairs_v1))
+    pairs_order = np.argsort(pairs_v1, kind='stable')
+    pairs_v1 = pairs_v1[pairs_order]
+    pairs_v2 = pairs_v2[pairs_order]
+    pairs_start = np.flatnonzero(np.append(True, pairs_v1[1:] != pairs_v1[:-1]))
+    paired_verts = pairs_v1[pairs_start]
+    while True:
+        first_vert = np.minimum(group_first_vert[paired_verts],
+                                np.minimum.reduceat(group_first_vert[pairs_v2], pairs_start))
+        if np.array_equal(first_vert, group_first_vert[paired_verts]):
+            return group_first_vert
+        group_first_vert[paired_verts] = first_vert
+        while True:
+            next_first_vert = group_first_vert[group_first_vert]
+            if np.array_equal(next_first_vert, group_first_vert):
+                break
+            group_first_vert = next_first_vert
 
-        faces_split.append(face)
 
-    # remove one of the items and reorder
-    verts_vcols = copy.copy(verts_vcols_split)
-    verts_vcols_split = []
-    return [(verts_split, faces_split, unique_materials_split, key_to_name(key), bool(use_vnor), bool(use_vtex))
-            for key, (verts_split, faces_split, unique_materials_split, _, use_vnor, use_vtex)
-            in face_split_dict.items()]
+def weld_vertices(verts_loc, verts_nor, verts_col, faces, vertex_groups, tolerance, rule='FIRST'):
+    """
+    Merge the vertices closer than tolerance (and, in a chain, those close to a merged one), only comparing
+    vertices of neighbor cells of a grid of that size, see weld_vertex_groups().
+    A merged vertex gets the position and color of the first one of its group with rule 'FIRST',
+    their average with rule 'AVERAGE'. The same rule gives a single normal to the loops of a merged vertex.
+    Face corners made consecutive copies of a same vertex are removed (and the faces left without area).
+    Returns verts_loc, verts_nor, verts_col, faces (with loops using per-loop normals
+    when normals were merged) and vertex_groups, and the number of vertices removed.
+    """
+    nbr_verts = len(verts_loc)
+    if not nbr_verts:
+        return verts_loc, verts_nor, verts_col, faces, vertex_groups, 0
+    group_first_vert = weld_vertex_groups(np.asarray(verts_loc, dtype=np.float64), tolerance)
+
+    # New vertices in the order of their first (old) one.
+    is_first = group_first_vert == np.arange(nbr_verts)
+    first_verts = np.flatnonzero(is_first)
+    nbr_welded = nbr_verts - len(first_verts)
+    if not nbr_welded:
+        return verts_loc, verts_nor, verts_col, faces, vertex_groups, 0
+    vert_index = (np.cumsum(is_first) - 1)[group_first_vert]
+    group_size = np.bincount(vert_index)
+    del group_first_vert, is_first
+
+    def reconciled(values, index, first):
+        values = np.asarray(values)
+        if rule == 'AVERAGE':
+            counts = np.bincount(index, minlength=len(first))
+            return np.stack([np.bincount(index, values[:, axis], minlength=len(first)) / counts
+                             for axis in range(values.shape[1])], axis=1).astype(values.dtype)
+        return values[first]
+
+    verts_loc = reconciled(verts_loc, vert_index, first_verts)
+    if len(verts_col):
+        verts_col = reconciled(verts_col, vert_index, first_verts)
+
+    faces_welded = FaceData.__new__(FaceData)
+    faces_welded.loop_v = vert_index[faces.loop_v].astype(np.int32)
+    for attr in ("loop_vt", "loop_vn", "loop_start", "loop_total", "material", "smooth_group", "object", "flags",
+                 "material_names", "smooth_group_names", "object_names", "_codes"):
+        setattr(faces_welded, attr, getattr(faces, attr))
+    faces = faces_welded
+
+    # One normal for the loops of each merged vertex that have one.
+    if len(verts_nor):
+        loop_is_merged = (group_size[faces.loop_v] > 1) & (faces.loop_vn >= 0)
+        merged_loops = np.flatnonzero(loop_is_merged)
+        if len(merged_loops):
+            _merged_verts, first_loop, merged_index = np.unique(faces.loop_v[merged_loops],
+                                                                return_index=True, return_inverse=True)
+            loops_nor = np.array(verts_nor, dtype=np.float32)[np.maximum(faces.loop_vn, 0)]
+            merged_nor = reconciled(loops_nor[merged_loops], merged_index.ravel(), first_loop)
+            if rule == 'AVERAGE':
+                merged_nor /= np.maximum(np.linalg.norm(merged_nor, axis=1), 1e-12)[:, None]
+            loops_nor[merged_loops] = merged_nor[merged_index.ravel()]
+            verts_nor = loops_nor
+            faces.loop_vn = np.where(faces.loop_vn >= 0, np.arange(len(faces.loop_vn)), -1).astype(np.int32)
+
+    # Remove the corners using the same vertex as the previous one (of the face, or of the polyline).
+    is_polyline = (faces.flags & FACE_POLYLINE) != 0
+    loop_face = np.repeat(np.arange(len(faces)), faces.loop_total)
+    prev_loops = np.arange(-1, len(faces.loop_v) - 1)
+    face_last_loops = faces.loop_start + faces.loop_total - 1
+    prev_loops[faces.loop_start] = np.where(is_polyline, -1, face_last_loops)
+    loop_keep = (prev_loops < 0) | (faces.loop_v != faces.loop_v[prev_loops])
+    if not loop_keep.all():
+        new_total = np.bincount(loop_face[loop_keep], minlength=len(faces)).astype(np.int32)
+        face_keep = (new_total == faces.loop_total) | (new_total >= np.where(is_polyline, 2, 3))
+        loop_keep &= face_keep[loop_face]
+        for attr in ("loop_v", "loop_vt", "loop_vn"):
+            setattr(faces, attr, getattr(faces, attr)[loop_keep])
+        for attr in ("material", "smooth_group", "object", "flags"):
+            setattr(faces, attr, getattr(faces, attr)[face_keep])
+        faces.loop_total = new_total[face_keep]
+        faces.loop_start = (np.cumsum(faces.loop_total) - faces.loop_total).astype(np.int32)
+        loop_face = np.repeat(np.arange(len(faces)), faces.loop_total)
+
+    # Faces now using a same vertex several times may have become Blender-invalid.
+    face_vert_keys = loop_face.astype(np.int64) * len(verts_loc) + faces.loop_v
+    face_vert_keys.sort()
+    faces.flags = faces.flags.copy()
+    for f_idx in np.unique(face_vert_keys[1:][face_vert_keys[1:] == face_vert_keys[:-1]] // len(verts_loc)).tolist():
+        loop_start = faces.loop_start[f_idx]
+        if not faces.flags[f_idx] & FACE_POLYLINE and is_invalid_blenpoly(
+                faces.loop_v[loop_start:loop_start + faces.loop_total[f_idx]].tolist()):
+            faces.flags[f_idx] = int(faces.flags[f_idx]) | FACE_INVALID_BLENPOLY
+
+    vertex_groups = {group_name: np.unique(vert_index[np.asarray(group_indices, dtype=np.int64)]).tolist()
+                     for group_name, group_indices in vertex_groups.items()}
+
+    return verts_loc, verts_nor, verts_col, faces, vertex_groups, nbr_welded
+
+
+def chunk_mesh(verts_loc, verts_col, faces, unique_materials, vertex_groups, dataname, max_verts):
+    """
+    Split a mesh in parts of at most max_verts vertices (unless a single face has more): the faces are
+    split in two halves at the median of their centers along the longest axis of their bounds, again and again.
+    The vertices on the border of two parts are in both, those of no face in none
+    (a mesh without faces has its vertices split the same way, by their positions).
+    Returns a list of (verts_loc, verts_col, faces, unique_materials, vertex_groups, dataname) of the parts
+    (named dataname_000, dataname_001... in the order of the splits).
+    """
+    use_faces = bool(len(faces))
+    if use_faces:
+        loop_face = np.repeat(np.arange(len(faces)), faces.loop_total)
+        items_center = np.stack([np.bincount(loop_face, np.asarray(verts_loc)[faces.loop_v, axis],
+                                             minlength=len(faces))
+                                 for axis in range(3)], axis=1) / np.maximum(faces.loop_total, 1)[:, None]
+        del loop_face
+    else:
+        items_center = np.asarray(verts_loc)
+
+    # Depth first (first half first), so that parts next to each other in space mostly follow each other.
+    parts = []
+    stack = [np.arange(len(items_center))]
+    while stack:
+        item_indices = stack.pop()
+        if use_faces:
+            part_verts = np.sort(faces.loop_v[faces.face_loops(item_indices)])
+            part_verts = part_verts[np.append(True, part_verts[1:] != part_verts[:-1])]
+        else:
+            part_verts = item_indices
+        if len(part_verts) <= max_verts or len(item_indices) == 1:
+            parts.append((item_indices if use_faces else item_indices[:0], part_verts))
+            continue
+        centers = items_center[item_indices]
+        axis = int(np.argmax(centers.max(axis=0) - centers.min(axis=0)))
+        half = len(item_indices) // 2
+        item_order = np.argpartition(centers[:, axis], half)
+        stack.append(np.sort(item_indices[item_order[half:]]))
+        stack.append(np.sort(item_indices[item_order[:half]]))
+    del items_center
+
+    chunks = []
+    vert_chunk_index = np.full(len(verts_loc), -1, dtype=np.int64)
+    for part_index, (face_indices, part_verts) in enumerate(parts):
+        faces_chunk = faces.subset(face_indices)
+        vert_chunk_index[part_verts] = np.arange(len(part_verts))
+        faces_chunk.loop_v = vert_chunk_index[faces_chunk.loop_v].astype(np.int32)
+
+        unique_materials_chunk = {}
+        for material_code in np.unique(faces_chunk.material).tolist():
+            matname = faces.material_names[material_code]
+            if matname in unique_materials:
+                unique_materials_chunk[matname] = unique_materials[matname]
+
+        vertex_groups_chunk = {}
+        for group_name, group_indices in vertex_groups.items():
+            group_indices = vert_chunk_index[np.asarray(group_indices, dtype=np.int64)]
+            vertex_groups_chunk[group_name] = group_indices[group_indices >= 0].tolist()
+        vert_chunk_index[part_verts] = -1
+
+        chunks.append((verts_loc[part_verts], verts_col[part_verts] if len(verts_col) else verts_col,
+                       faces_chunk, unique_materials_chunk, vertex_groups_chunk, "%s_%03d" % (dataname, part_index)))
+    return chunks
+
+
+def mesh_fingerprint(verts_loc, verts_nor, verts_tex, verts_col, faces, unique_materials):
+    """
+    Returns a key identifying everything but the vertex positions of the mesh create_mesh() makes from this data,
+    the vertex positions moved by -offset and offset (the center of their bounds).
+    Copies of a same shape at different places get the same key and (about) the same moved positions.
+    """
+    verts_loc = np.asarray(verts_loc, dtype=np.float64)
+    offset = (verts_loc.min(axis=0) + verts_loc.max(axis=0)) / 2 if len(verts_loc) else np.zeros(3)
+
+    key = hashlib.sha1(repr(list(unique_materials)).encode())
+    key.update(np.int64(len(verts_loc)).tobytes())
+    for items in (faces.loop_v, faces.loop_total, faces.flags, faces.material, faces.smooth_group):
+        key.update(np.ascontiguousarray(items).tobytes())
+    for loop_indices, values in ((faces.loop_vn, verts_nor), (faces.loop_vt, verts_tex)):
+        if len(values):
+            key.update(np.ascontiguousarray(np.asarray(values)[np.maximum(loop_indices, 0)]).tobytes())
+            key.update((loop_indices >= 0).tobytes())
+    key.update(np.ascontiguousarray(verts_col).tobytes())
+    return key.hexdigest(), verts_loc - offset, offset
+
+
+def mesh_hash(verts_loc, verts_nor, verts_tex, verts_col, faces, vertex_groups, settings=()):
+    """
+    Returns a hash of everything the mesh create_mesh() makes from this data depends on, settings being
+    the load() options that change it (faces being None for the point clouds of create_point_cloud()).
+    Unlike mesh_fingerprint(), materials and smooth groups are hashed by name, their codes depending
+    on the rest of the file.
+    """
+    key = hashlib.sha1(repr((settings, faces is None)).encode())
+    key.update(np.ascontiguousarray(verts_loc, dtype=np.float32).tobytes())
+    if faces is not None:
+        for codes, names in ((faces.material, faces.material_names),
+                             (faces.smooth_group, faces.smooth_group_names)):
+            used_codes, face_rank = np.unique(codes, return_inverse=True)
+            key.update(repr([names[code] for code in used_codes.tolist()]).encode())
+            key.update(face_rank.astype(np.int32).tobytes())
+        for items in (faces.loop_v, faces.loop_total, faces.flags):
+            key.update(np.ascontiguousarray(items).tobytes())
+        for loop_indices, values in ((faces.loop_vn, verts_nor), (faces.loop_vt, verts_tex)):
+            if len(values):
+                key.update(np.ascontiguousarray(np.asarray(values)[np.maximum(loop_indices, 0)]).tobytes())
+                key.update((loop_indices >= 0).tobytes())
+    key.update(np.ascontiguousarray(verts_col).tobytes())
+    for group_name in sorted(vertex_groups):
+        key.update(repr(group_name).encode())
+        key.update(np.asarray(vertex_groups[group_name], dtype=np.int64).tobytes())
+    return key.hexdigest()
 
 
 def create_mesh(new_objects,
@@ -607,119 +1350,110 @@ def create_mesh(new_objects,
                 verts_loc,
                 verts_nor,
                 verts_tex,
+                verts_col,
                 faces,
                 unique_materials,
                 unique_material_images,
                 unique_smooth_groups,
                 vertex_groups,
                 dataname,
+                profile=None,
+                use_point_colors=False,
                 ):
     """
     Takes all the data gathered and generates a mesh, adding the new object to new_objects
-    deals with ngons, sharp edges and assigning materials
+    deals with ngons, sharp edges, assigning materials and vertex colors
+    (with use_point_colors, once per vertex in a byte color attribute since Blender 2.92, see create_point_colors())
     """
-
-    if unique_smooth_groups:
-        sharp_edges = set()
-        smooth_group_users = {context_smooth_group: {} for context_smooth_group in unique_smooth_groups.keys()}
-        context_smooth_group_old = -1
+    if profile is None:
+        profile = ImportProfile(use_tracemalloc=False)
 
     fgon_edges = set()  # Used for storing fgon keys when we need to tesselate/untesselate them (ngons with hole).
     edges = []
-    tot_loops = 0
-
-    context_object = None
-
-    # reverse loop through face indices
-    for f_idx in range(len(faces) - 1, -1, -1):
-        (face_vert_loc_indices,
-         face_vert_nor_indices,
-         face_vert_tex_indices,
-         context_material,
-         context_smooth_group,
-         context_object,
-         face_invalid_blenpoly,
-         ) = faces[f_idx]
-
-        len_face_vert_loc_indices = len(face_vert_loc_indices)
 
-        if len_face_vert_loc_indices == 1:
-            faces.pop(f_idx)  # cant add single vert faces
-
-        # Face with a single item in face_vert_nor_indices is actually a polyline!
-        elif len(face_vert_nor_indices) == 1 or len_face_vert_loc_indices == 2:
-            if use_edges:
-                edges.extend((face_vert_loc_indices[i], face_vert_loc_indices[i + 1])
-                             for i in range(len_face_vert_loc_indices - 1))
-            faces.pop(f_idx)
-
-        else:
-            # Smooth Group
-            if unique_smooth_groups and context_smooth_group:
-                # Is a part of of a smooth group and is a face
-                if context_smooth_group_old is not context_smooth_group:
-                    edge_dict = smooth_group_users[context_smooth_group]
-                    context_smooth_group_old = context_smooth_group
-
-                prev_vidx = face_vert_loc_indices[-1]
-                for vidx in face_vert_loc_indices:
-                    edge_key = (prev_vidx, vidx) if (prev_vidx < vidx) else (vidx, prev_vidx)
-                    prev_vidx = vidx
-                    edge_dict[edge_key] = edge_dict.get(edge_key, 0) + 1
-
-            # NGons into triangles
-            if face_invalid_blenpoly:
-                # ignore triangles with invalid indices
-                if len(face_vert_loc_indices) > 3:
-                    from bpy_extras.mesh_utils import ngon_tessellate
-                    ngon_face_indices = ngon_tessellate(verts_loc, face_vert_loc_indices)
-                    faces.extend([([face_vert_loc_indices[ngon[0]],
-                                    face_vert_loc_indices[ngon[1]],
-                                    face_vert_loc_indices[ngon[2]],
-                                    ],
-                                [face_vert_nor_indices[ngon[0]],
-                                    face_vert_nor_indices[ngon[1]],
-                                    face_vert_nor_indices[ngon[2]],
-                                    ] if face_vert_nor_indices else [],
-                                [face_vert_tex_indices[ngon[0]],
-                                    face_vert_tex_indices[ngon[1]],
-                                    face_vert_tex_indices[ngon[2]],
-                                    ] if face_vert_tex_indices else [],
-                                context_material,
-                                context_smooth_group,
-                                context_object,
-                                [],
-                                )
-                                for ngon in ngon_face_indices]
-                                )
-                    tot_loops += 3 * len(ngon_face_indices)
-
-                    # edges to make ngons
-                    if len(ngon_face_indices) > 1:
-                        edge_users = set()
-                        for ngon in ngon_face_indices:
-                            prev_vidx = face_vert_loc_indices[ngon[-1]]
-                            for ngidx in ngon:
-                                vidx = face_vert_loc_indices[ngidx]
-                                if vidx == prev_vidx:
-                                    continue  # broken OBJ... Just skip.
-                                edge_key = (prev_vidx, vidx) if (prev_vidx < vidx) else (vidx, prev_vidx)
-                                prev_vidx = vidx
-                                if edge_key in edge_users:
-                                    fgon_edges.add(edge_key)
-                                else:
-                                    edge_users.add(edge_key)
-
-                faces.pop(f_idx)
-            else:
-                tot_loops += len_face_vert_loc_indices
+    material_names = faces.material_names
+    smooth_group_names = faces.smooth_group_names
+    faces_total = faces.loop_total
+    is_polyline = (faces_total >= 2) & (((faces.flags & FACE_POLYLINE) != 0) | (faces_total == 2))
+    is_poly = (faces_total > 2) & ((faces.flags & FACE_POLYLINE) == 0)  # single vert faces are skipped
+    is_invalid = is_poly & ((faces.flags & FACE_INVALID_BLENPOLY) != 0)
+    profile.count("faces", int(np.count_nonzero(is_poly)))
+    profile.count("ngons", int(np.count_nonzero(is_poly & (faces_total > 4))))
+    profile.count("invalid_faces", int(np.count_nonzero(is_invalid)))
+    smooth_group_code_smooth = np.array([bool(name) for name in smooth_group_names], dtype=bool)
+
+    # Faces kept as they are, and triangles of the Blender-invalid ngons.
+    use_face = is_poly & ~is_invalid
+    tris_loops = []
+    tris_faces = []
+
+    # reverse loop through polyline and invalid face indices
+    loop_v = faces.loop_v
+    loop_start = faces.loop_start
+    for f_idx in np.flatnonzero((is_polyline & use_edges) | is_invalid)[::-1].tolist():
+        len_face_vert_loc_indices = int(faces_total[f_idx])
+        face_vert_loc_indices = loop_v[loop_start[f_idx]:loop_start[f_idx] + len_face_vert_loc_indices].tolist()
+
+        if is_polyline[f_idx]:
+            edges.extend(zip(face_vert_loc_indices[:-1], face_vert_loc_indices[1:]))
+
+        # NGons into triangles
+        # ignore triangles with invalid indices
+        elif len_face_vert_loc_indices > 3:
+            from bpy_extras.mesh_utils import ngon_tessellate
+            ngon_face_indices = ngon_tessellate([tuple(verts_loc[vidx]) for vidx in face_vert_loc_indices],
+                                                range(len_face_vert_loc_indices))
+            tris_loops.extend(int(loop_start[f_idx]) + ngidx for ngon in ngon_face_indices for ngidx in ngon[:3])
+            tris_faces.extend([f_idx] * len(ngon_face_indices))
+
+            # edges to make ngons
+            if len(ngon_face_indices) > 1:
+                edge_users = set()
+                for ngon in ngon_face_indices:
+                    prev_vidx = face_vert_loc_indices[ngon[-1]]
+                    for ngidx in ngon:
+                        vidx = face_vert_loc_indices[ngidx]
+                        if vidx == prev_vidx:
+                            continue  # broken OBJ... Just skip.
+                        edge_key = (prev_vidx, vidx) if (prev_vidx < vidx) else (vidx, prev_vidx)
+                        prev_vidx = vidx
+                        if edge_key in edge_users:
+                            fgon_edges.add(edge_key)
+                        else:
+                            edge_users.add(edge_key)
 
-    # Build sharp edges
+    # Build sharp edges: the ones of smooth grouped faces used by a single face of their smooth group
+    # (on the boundry of a group), as a sorted array of edge keys (see edge_keys()).
     if unique_smooth_groups:
-        for edge_dict in smooth_group_users.values():
-            for key, users in edge_dict.items():
-                if users == 1:  # This edge is on the boundry of a group
-                    sharp_edges.add(key)
+        smooth_faces = np.flatnonzero(is_poly & smooth_group_code_smooth[faces.smooth_group])
+        smooth_loops = faces.face_loops(smooth_faces)
+        smooth_loops_total = faces_total[smooth_faces]
+        # Previous loop of each loop in its face (the last one for the first loop).
+        prev_loops = smooth_loops[np.arange(-1, len(smooth_loops) - 1)]
+        first_loops = np.cumsum(smooth_loops_total) - smooth_loops_total
+        prev_loops[first_loops] = smooth_loops[first_loops + smooth_loops_total - 1]
+        smooth_edge_keys = edge_keys(loop_v[prev_loops], loop_v[smooth_loops], len(verts_loc))
+        smooth_edge_groups = np.repeat(faces.smooth_group[smooth_faces], smooth_loops_total)
+
+        # Count the users of each edge in each group, from runs of equal (group, edge) pairs.
+        order = np.lexsort((smooth_edge_keys, smooth_edge_groups))
+        smooth_edge_keys = smooth_edge_keys[order]
+        smooth_edge_groups = smooth_edge_groups[order]
+        run_start = np.ones(len(order) + 1, dtype=bool)
+        run_start[1:-1] = ((smooth_edge_keys[1:] != smooth_edge_keys[:-1]) |
+                           (smooth_edge_groups[1:] != smooth_edge_groups[:-1]))
+        run_start = np.flatnonzero(run_start)
+        sharp_edges = np.unique(smooth_edge_keys[run_start[:-1][np.diff(run_start) == 1]])
+        del smooth_loops, prev_loops, smooth_edge_keys, smooth_edge_groups, order, run_start
+
+    # Loops and faces of the mesh, as flat arrays: the kept faces, then the triangles.
+    face_indices = np.concatenate((np.flatnonzero(use_face), np.array(tris_faces, dtype=np.int64)))
+    loop_indices = np.concatenate((faces.face_loops(face_indices[:len(face_indices) - len(tris_faces)]),
+                                   np.array(tris_loops, dtype=np.int64)))
+    faces_loop_total = np.concatenate((faces.loop_total[face_indices[:len(face_indices) - len(tris_faces)]],
+                                       np.full(len(tris_faces), 3, dtype=np.int32)))
+    faces_loop_start = np.cumsum(faces_loop_total) - faces_loop_total
+    tot_loops = len(loop_indices)
 
     # map the material names to an index
     material_mapping = {name: i for i, name in enumerate(unique_materials)}  # enumerate over unique_materials keys()
@@ -737,73 +1471,58 @@ def create_mesh(new_objects,
 
     me.vertices.add(len(verts_loc))
     me.loops.add(tot_loops)
-    me.polygons.add(len(faces))
-
-    # verts_loc is a list of (x, y, z) tuples
-    me.vertices.foreach_set("co", unpack_list(verts_loc))
-
-    loops_vert_idx = []
-    faces_loop_start = []
-    faces_loop_total = []
-    lidx = 0
-    for f in faces:
-        vidx = f[0]
-        nbr_vidx = len(vidx)
-        loops_vert_idx.extend(vidx)
-        faces_loop_start.append(lidx)
-        faces_loop_total.append(nbr_vidx)
-        lidx += nbr_vidx
-
-    me.loops.foreach_set("vertex_index", loops_vert_idx)
-    me.polygons.foreach_set("loop_start", faces_loop_start)
+    me.polygons.add(len(face_indices))
+
+    # verts_loc is a (N, 3) float array, or a list of its rows
+    me.vertices.foreach_set("co", np.asarray(verts_loc, dtype=np.float32).ravel())
+
+    me.loops.foreach_set("vertex_index", faces.loop_v[loop_indices])
+    me.polygons.foreach_set("loop_start", faces_loop_start.astype(np.int32))
     me.polygons.foreach_set("loop_total", faces_loop_total)
 
-    if verts_nor and me.loops:
+    if len(verts_nor) and me.loops:
         # Note: we store 'temp' normals in loops, since validate() may alter final mesh,
         #       we can only set custom lnors *after* calling it.
         me.create_normals_split()
 
-    if verts_tex and me.polygons:
+    if len(verts_tex) and me.polygons:
         me.uv_textures.new()
 
-    context_material_old = -1  # avoid a dict lookup
-    mat = 0  # rare case it may be un-initialized.
-
-    for i, (face, blen_poly) in enumerate(zip(faces, me.polygons)):
-        if len(face[0]) < 3:
-            raise Exception("bad face")  # Shall not happen, we got rid of those earlier!
-
-        (face_vert_loc_indices,
-         face_vert_nor_indices,
-         face_vert_tex_indices,
-         context_material,
-         context_smooth_group,
-         context_object,
-         face_invalid_blenpoly,
-         ) = face
-
-        if context_smooth_group:
-            blen_poly.use_smooth = True
-
-        if context_material:
-            if context_material_old is not context_material:
-                mat = material_mapping[context_material]
-                context_material_old = context_material
-            blen_poly.material_index = mat
-
-        if verts_nor and face_vert_nor_indices:
-            for face_noidx, lidx in zip(face_vert_nor_indices, blen_poly.loop_indices):
-                me.loops[lidx].normal[:] = verts_nor[0 if (face_noidx is ...) else face_noidx]
-
-        if verts_tex and face_vert_tex_indices:
-            if context_material:
-                image = unique_material_images[context_material]
-                if image:  # Can be none if the material dosnt have an image.
-                    me.uv_textures[0].data[i].image = image
-
-            blen_uvs = me.uv_layers[0]
-            for face_uvidx, lidx in zip(face_vert_tex_indices, blen_poly.loop_indices):
-                blen_uvs.data[lidx].uv = verts_tex[0 if (face_uvidx is ...) else face_uvidx]
+    # Per polygon and per loop data, written with foreach_set.
+    faces_material = faces.material[face_indices]
+    faces_flags = faces.flags[face_indices]
+    loops_flags = np.repeat(faces_flags, faces_loop_total)
+
+    # Polygons without a material keep index 0 (names of the codes can also be the ones of other split meshes).
+    material_code_index = np.array([material_mapping.get(name, 0) for name in material_names], dtype=np.int32)
+    me.polygons.foreach_set("material_index", material_code_index[faces_material])
+
+    me.polygons.foreach_set("use_smooth", smooth_group_code_smooth[faces.smooth_group[face_indices]])
+
+    # Loops of faces without normal (uv) indices keep their value, the ones with a placeholder (-1)
+    # index in such faces use the first normal (uv).
+    if len(verts_nor) and me.loops:
+        use_nor = (loops_flags & FACE_USE_NOR).astype(bool)
+        loops_nor = np.empty((len(me.loops), 3), dtype=np.float32)
+        me.loops.foreach_get("normal", loops_nor.ravel())
+        loops_nor[use_nor] = verts_nor[np.maximum(faces.loop_vn[loop_indices[use_nor]], 0)]
+        me.loops.foreach_set("normal", loops_nor.ravel())
+
+    if len(verts_tex) and me.polygons:
+        use_tex = (loops_flags & FACE_USE_TEX).astype(bool)
+        blen_uvs = me.uv_layers[0]
+        loops_uv = np.empty((len(blen_uvs.data), 2), dtype=np.float32)
+        blen_uvs.data.foreach_get("uv", loops_uv.ravel())
+        loops_uv[use_tex] = verts_tex[np.maximum(faces.loop_vt[loop_indices[use_tex]], 0)]
+        blen_uvs.data.foreach_set("uv", loops_uv.ravel())
+
+        # Images can not be set in bulk, only go through the textured faces with one.
+        material_code_image = [unique_material_images.get(name) if name else None for name in material_names]
+        blen_images = me.uv_textures[0].data
+        for i in np.flatnonzero(faces_flags & FACE_USE_TEX).tolist():
+            image = material_code_image[faces_material[i]]
+            if image:  # Can be none if the material dosnt have an image.
+                blen_images[i].image = image
 
     use_edges = use_edges and bool(edges)
     if use_edges:
@@ -811,76 +1530,67 @@ def create_mesh(new_objects,
         # edges should be a list of (a, b) tuples
         me.edges.foreach_set("vertices", unpack_list(edges))
 
-    me.validate(clean_customdata=False)  # *Very* important to not remove lnors here!
-    me.update(calc_edges=use_edges)
+    with profile.phase("validate"):
+        me.validate(clean_customdata=False)  # *Very* important to not remove lnors here!
+        me.update(calc_edges=use_edges)
 
     # Un-tessellate as much as possible, in case we had to triangulate some ngons...
     if fgon_edges:
-        import bmesh
-        bm = bmesh.new()
-        bm.from_mesh(me)
-        verts = bm.verts[:]
-        get = bm.edges.get
-        edges = [get((verts[vidx1], verts[vidx2])) for vidx1, vidx2 in fgon_edges]
-        try:
-            bmesh.ops.dissolve_edges(bm, edges=edges, use_verts=False)
-        except:
-            # Possible dissolve fails for some edges, but don't fail silently in case this is a real bug.
-            import traceback
-            traceback.print_exc()
-
-        bm.to_mesh(me)
-        bm.free()
+        with profile.phase("untessellate"):
+            import bmesh
+            bm = bmesh.new()
+            bm.from_mesh(me)
+            verts = bm.verts[:]
+            get = bm.edges.get
+            edges = [get((verts[vidx1], verts[vidx2])) for vidx1, vidx2 in fgon_edges]
+            try:
+                bmesh.ops.dissolve_edges(bm, edges=edges, use_verts=False)
+            except:
+                # Possible dissolve fails for some edges, but don't fail silently in case this is a real bug.
+                import traceback
+                traceback.print_exc()
+
+            bm.to_mesh(me)
+            bm.free()
 
     # XXX If validate changes the geometry, this is likely to be broken...
-    if unique_smooth_groups and sharp_edges:
-        for e in me.edges:
-            if e.key in sharp_edges:
-                e.use_edge_sharp = True
+    if unique_smooth_groups and len(sharp_edges):
+        edges_vertices = np.empty(len(me.edges) * 2, dtype=np.int32)
+        me.edges.foreach_get("vertices", edges_vertices)
+        edges_sharp = np.empty(len(me.edges), dtype=bool)
+        me.edges.foreach_get("use_edge_sharp", edges_sharp)
+        edges_sharp |= np.isin(edge_keys(edges_vertices[0::2], edges_vertices[1::2], len(verts_loc)), sharp_edges)
+        me.edges.foreach_set("use_edge_sharp", edges_sharp)
         me.show_edge_sharp = True
 
-    if verts_nor:
-        clnors = array.array('f', [0.0] * (len(me.loops) * 3))
-        me.loops.foreach_get("normal", clnors)
+    if len(verts_nor):
+        with profile.phase("normals"):
+            clnors = array.array('f', [0.0] * (len(me.loops) * 3))
+            me.loops.foreach_get("normal", clnors)
 
-        if not unique_smooth_groups:
-            me.polygons.foreach_set("use_smooth", [True] * len(me.polygons))
+            if not unique_smooth_groups:
+                me.polygons.foreach_set("use_smooth", [True] * len(me.polygons))
 
-        me.normals_split_custom_set(tuple(zip(*(iter(clnors),) * 3)))
-        me.use_auto_smooth = True
-        me.show_edge_sharp = True
+            me.normals_split_custom_set(tuple(zip(*(iter(clnors),) * 3)))
+            me.use_auto_smooth = True
+            me.show_edge_sharp = True
 
     ob = bpy.data.objects.new(me.name, me)
 
 
-    if len(verts_vcols) > 0:
-        mesh = ob.data
-        mesh.vertex_colors.new()
-        vcol_layer = mesh.vertex_colors["Col"]
-    
-                # print(loop_vert_index)
-                    # if vert == loop_vert_index:
-                # vcol_layer.data[i].color = verts_vcols[loop_vert_index]
-                # print(mesh.loops[loop_index])
-                
-        vertices_all = ob.data.vertices
-        polys_all =  ob.data.polygons
-        i = 0
-        print("xxxxxxxxxxxxxxxxxxxxxxxxxx")
-        
-        
-        # print(len(me.vertices))
-        # print(len(vcol_layer.data))
-        # print(len(me.loops))
-        # print(me.vertices[0].co)
-        for face in me.polygons:
-            verts_in_face = face.vertices[:]
-            for vert in verts_in_face:    
-                vcol_layer.data[i].color = verts_vcols[vert]
-                i += 1
-        global verts_vcols
-        verts_vcols = []
+    if len(verts_col) and len(verts_col) == len(verts_loc) and use_point_colors and hasattr(me, "attributes"):
+        # All the loops of a vertex have its color.
+        create_point_colors(me, verts_col, 'BYTE_COLOR')
+    elif len(verts_col) and len(verts_col) == len(verts_loc):
+        vcol_layer = me.vertex_colors.new()
 
+        # Color of the vertex of each loop, RGB before Blender 2.80, RGBA since.
+        loops_vert_idx = np.empty(len(me.loops), dtype=np.int32)
+        me.loops.foreach_get("vertex_index", loops_vert_idx)
+        loops_col = np.asarray(verts_col, dtype=np.float32)[loops_vert_idx]
+        if bpy.app.version >= (2, 80, 0):
+            loops_col = np.hstack((loops_col, np.ones((len(loops_col), 1), dtype=np.float32)))
+        vcol_layer.data.foreach_set("color", loops_col.ravel())
 
     new_objects.append(ob)
 
@@ -892,6 +1602,94 @@ def create_mesh(new_objects,
         group.add(group_indices, 1.0, 'REPLACE')
 
 
+def replace_object_mesh(ob, new_ob):
+    """
+    Give ob the mesh and vertex groups made for new_ob (by create_mesh()), then remove new_ob,
+    and the former mesh of ob when nothing else uses it, whose name the new mesh then takes.
+    Everything else about ob (transform, modifiers, material slots linked to the object...) is kept.
+    """
+    old_me = ob.data
+    ob.data = new_ob.data
+    # Vertex group weights are kept in the mesh, by group index.
+    ob.vertex_groups.clear()
+    for group in new_ob.vertex_groups:
+        ob.vertex_groups.new(group.name)
+    bpy.data.objects.remove(new_ob, do_unlink=True)
+    if old_me is not None and not old_me.users:
+        # Made while the former mesh still had its name, the new one got another (as 'name.001').
+        name = old_me.name
+        bpy.data.meshes.remove(old_me)
+        ob.data.name = name
+
+
+def downsample_points(verts_loc, verts_col, step=1, voxel_size=0.0):
+    """
+    Keep one of every step points, then with voxel_size, replace the points of each cell of a grid of that size
+    by one at their average position, with their average color.
+    Returns verts_loc and verts_col (empty when not given), as float32 arrays.
+    """
+    verts_loc = np.asarray(verts_loc, dtype=np.float32)[::step]
+    verts_col = np.asarray(verts_col, dtype=np.float32)[::step]
+    if not voxel_size or not len(verts_loc):
+        return verts_loc, verts_col
+
+    keys, _cell_strides, cell_size = grid_cell_keys(verts_loc, voxel_size)
+    if cell_size != voxel_size:
+        print("\tWarning, voxel size too small for the extent of the points, using %g" % cell_size)
+    order = np.argsort(keys)
+    keys = keys[order]
+    cell_start = np.flatnonzero(np.append(True, keys[1:] != keys[:-1]))
+    cell_total = np.diff(np.append(cell_start, len(keys)))
+    del keys
+
+    def averaged(values):
+        # One axis at a time, to only copy that much of the points.
+        return np.stack([np.add.reduceat(values[order, axis], cell_start, dtype=np.float64) / cell_total
+                         for axis in range(values.shape[1])], axis=1).astype(np.float32)
+
+    verts_loc = averaged(verts_loc)
+    if len(verts_col):
+        verts_col = averaged(verts_col)
+    return verts_loc, verts_col
+
+
+def create_point_colors(me, verts_col, data_type='FLOAT_COLOR'):
+    """
+    Add a "Col" color attribute of the vertices of me (Blender 2.92+) holding the verts_col colors,
+    of data_type 'FLOAT_COLOR' or 'BYTE_COLOR'. Like vertex color layers, the latter takes the colors as sRGB ones.
+    """
+    col_attr = me.attributes.new("Col", data_type, 'POINT')
+    verts_rgba = np.ones((len(verts_col), 4), dtype=np.float32)
+    verts_rgba[:, :3] = verts_col
+    use_srgb = data_type == 'BYTE_COLOR' and bpy.app.version >= (3, 4, 0)
+    col_attr.data.foreach_set("color_srgb" if use_srgb else "color", verts_rgba.ravel())
+    if hasattr(me, "color_attributes"):
+        me.color_attributes.active_color = col_attr
+
+
+def create_point_cloud(new_objects, verts_loc, verts_col, dataname, use_point_colors=False):
+    """
+    Add a mesh of the verts_loc points only, whose verts_col colors are written to a color attribute
+    of the vertices (since Blender 2.92, of bytes with use_point_colors), or to a float layer
+    of the vertices per channel before.
+    """
+    me = bpy.data.meshes.new(dataname)
+    me.vertices.add(len(verts_loc))
+    me.vertices.foreach_set("co", np.ascontiguousarray(verts_loc, dtype=np.float32).ravel())
+
+    if len(verts_col) and len(verts_col) == len(verts_loc):
+        verts_col = np.asarray(verts_col, dtype=np.float32)
+        if hasattr(me, "attributes"):
+            create_point_colors(me, verts_col, 'BYTE_COLOR' if use_point_colors else 'FLOAT_COLOR')
+        else:
+            for axis, name in enumerate(("Col.R", "Col.G", "Col.B")):
+                col_layer = me.vertex_layers_float.new(name)
+                col_layer.data.foreach_set("value", np.ascontiguousarray(verts_col[:, axis]))
+
+    me.update()
+    new_objects.append(bpy.data.objects.new(me.name, me))
+
+
 def create_nurbs(context_nurbs, vert_loc, new_objects):
     """
     Add nurbs object to blender, only support one type at the moment
@@ -975,46 +1773,335 @@ def strip_slash(line_split):
     return False
 
 
-def get_float_func(filepath):
+def get_float_func(data):
     """
-    find the float function for this obj file
+    find the float function for this obj file data (a chunk of it, see iter_obj_chunks())
     - whether to replace commas or not
+    Returns None if no vertex line with decimals was found in data.
     """
-    file = open(filepath, 'rb')
-    for line in file:  # .readlines():
-        line = line.lstrip()
-        if line.startswith(b'v'):  # vn vt v
-            if b',' in line:
-                file.close()
-                return lambda f: float(f.replace(b',', b'.'))
-            elif b'.' in line:
-                file.close()
-                return float
-
-    file.close()
-    # in case all vert values were ints
+    m = FLOAT_FORMAT_RE.search(data)
+    if m is None:
+        return None
+    line_end = data.find(b'\n', m.end())
+    if b',' in data[m.start():line_end if line_end != -1 else len(data)]:
+        return float_comma
     return float
 
 
-def load(context,
-         filepath,
-         *,
-         global_clamp_size=0.0,
-         use_smooth_groups=True,
-         use_edges=True,
-         use_split_objects=True,
-         use_split_groups=True,
-         use_image_search=True,
-         use_groups_as_vgroups=False,
-         use_cycles=True,
-         relpath=None,
-         global_matrix=None
-         ):
+def float_comma(f):
+    return float(f.replace(b',', b'.'))
+
+
+@contextlib.contextmanager
+def map_obj_file(f):
     """
-    Called by the user interface or another script.
-    load_obj(path) - should give acceptable results.
-    This function passes the file and sends the data off
-        to be split into objects and then converted into mesh objects
+    Memory-map the obj file f (opened in binary mode) for reading.
+    An empty file gives an empty bytes object, since it can't be mapped.
+    """
+    if os.fstat(f.fileno()).st_size == 0:
+        yield b''
+    else:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            yield data
+
+
+def iter_obj_chunks(data, start=0, end=None, chunk_size=OBJ_CHUNK_SIZE):
+    """
+    Walk data[start:end] (start being 0 or just after a newline) in chunks of about chunk_size bytes,
+    split at line boundaries. Each chunk starts with the newline ending the previous line
+    (one is added to the first chunk of the file), so every line start in it follows a newline.
+    """
+    if end is None:
+        end = len(data)
+    while start < end:
+        stop = end
+        if end - start > chunk_size:
+            stop = data.find(b'\n', start + chunk_size, end) + 1 or end
+        yield data[start - 1:stop] if start else b'\n' + data[:stop]
+        start = stop
+
+
+def iter_obj_lines(chunk, use_bulk_parse):
+    """
+    Split a chunk of obj data (see iter_obj_chunks()) into lines.
+    With use_bulk_parse, each run of consecutive single-line v/vn/vt statements is yielded whole,
+    as one item which (unlike any line) starts with a newline.
+    """
+    if not use_bulk_parse:
+        yield from chunk.split(b'\n')
+        return
+    pos = 0
+    for m in VEC_RUN_RE.finditer(chunk):
+        yield from chunk[pos:m.start()].split(b'\n')
+        yield m.group()
+        pos = m.end()
+    yield from chunk[pos:].split(b'\n')
+
+
+class VecBuffer:
+    """
+    Growable list of fixed size float vectors (positions, normals, uvs or colors),
+    stored as a list of float32 blocks instead of one tuple per vector.
+    Single vectors are appended to a pending list, whole runs are added as blocks.
+    With spill, blocks moved to the storage (see view()) are written to a temporary file instead of memory.
+    """
+    __slots__ = ("size", "blocks", "pending", "total", "storage", "spill_file")
+
+    def __init__(self, size, spill=False):
+        self.size = size
+        self.blocks = []
+        self.pending = []
+        self.total = 0
+        self.storage = None
+        self.spill_file = tempfile.TemporaryFile(prefix="obj_import_") if spill else None
+
+    def __len__(self):
+        return self.total
+
+    def _flush_pending(self):
+        if self.pending:
+            self.blocks.append(np.array(self.pending, dtype=np.float32).reshape(-1, self.size))
+            self.pending = []
+
+    def append(self, vec):
+        self.pending.append(vec)
+        self.total += 1
+
+    def add_block(self, block):
+        self._flush_pending()
+        self.blocks.append(block)
+        self.total += len(block)
+
+    def view(self):
+        """
+        Returns all vectors so far as a (N, size) array, for when that is needed repeatedly while
+        adding vectors: blocks are moved once to a storage that grows by doubling its size,
+        or appended to the spill file which is then memory-mapped.
+        """
+        self._flush_pending()
+        if self.spill_file is not None:
+            for block in self.blocks:
+                self.spill_file.write(np.ascontiguousarray(block, dtype=np.float32).data)
+            self.blocks = []
+            if not self.total:
+                return np.empty((0, self.size), dtype=np.float32)
+            self.spill_file.flush()
+            self.storage = np.memmap(self.spill_file, dtype=np.float32, mode='r', shape=(self.total, self.size))
+            return self.storage
+
+        nbr_stored = self.total - sum(len(block) for block in self.blocks)
+        if self.storage is None or len(self.storage) < self.total:
+            storage = np.empty((max(self.total, 2 * nbr_stored), self.size), dtype=np.float32)
+            if nbr_stored:
+                storage[:nbr_stored] = self.storage[:nbr_stored]
+            self.storage = storage
+        for block in self.blocks:
+            self.storage[nbr_stored:nbr_stored + len(block)] = block
+            nbr_stored += len(block)
+        self.blocks = []
+        return self.storage[:self.total]
+
+    def to_array(self):
+        """
+        Returns all vectors as a single float32 (N, size) array.
+        """
+        if self.storage is not None or self.spill_file is not None:
+            return self.view()
+        self._flush_pending()
+        if not self.blocks:
+            return np.empty((0, self.size), dtype=np.float32)
+        if len(self.blocks) == 1:
+            return np.ascontiguousarray(self.blocks[0])
+        return np.concatenate(self.blocks)
+
+
+def parse_vec_block(lines, tag, vec_len, comma_decimal):
+    """
+    Convert a run of single-line 'v', 'vn' or 'vt' statements (raw lines or blocks of lines, all with
+    the same tag) in one step.
+    Returns a float32 (nbr_lines, width) array, or None when the lines do not all have the same number
+    of values (or less than vec_len), in which case they have to go through the per line path.
+    """
+    block = b'\n'.join(lines)
+    if comma_decimal:
+        block = block.replace(b',', b'.')
+    tokens = block.split()
+    nbr = tokens.count(tag)
+    stride, rest = divmod(len(tokens), nbr)
+    # Every line starts with its tag, so with a regular run the tags are exactly every stride-th token.
+    if rest or stride - 1 < vec_len or tokens[::stride].count(tag) != nbr:
+        return None
+    del tokens[::stride]
+
+    # Converted with float() itself (so values match the per line path exactly),
+    # into a preallocated float32 array, without any intermediate Python list.
+    try:
+        values = np.fromiter(map(float, tokens), dtype=np.float32, count=len(tokens))
+    except ValueError:
+        return None
+    return values.reshape(nbr, stride - 1)
+
+
+class FaceData:
+    """
+    Faces (and polylines) of an obj file, stored as flat arrays instead of one tuple of lists per face.
+    Face i uses the loops loop_start[i]:loop_start[i] + loop_total[i] of loop_v (vertex indices),
+    loop_vt and loop_vn (uv and normal indices, -1 where that face corner has none).
+    Its material, smooth group and object are codes into material_names, smooth_group_names and
+    object_names (0 for None), and flags holds its FACE_* bits.
+
+    Filled with array.array items while parsing, finish() turns them into numpy arrays.
+    """
+    __slots__ = ("loop_v", "loop_vt", "loop_vn", "loop_start", "loop_total",
+                 "material", "smooth_group", "object", "flags",
+                 "material_names", "smooth_group_names", "object_names", "_codes")
+
+    def __init__(self, index_typecode='i'):
+        self.loop_v = array.array(index_typecode)
+        self.loop_vt = array.array(index_typecode)
+        self.loop_vn = array.array(index_typecode)
+        self.loop_start = array.array('i')
+        self.loop_total = None
+        self.material = array.array('i')
+        self.smooth_group = array.array('i')
+        self.object = array.array('i')
+        self.flags = array.array('B')
+        self.material_names = [None]
+        self.smooth_group_names = [None]
+        self.object_names = [None]
+        self._codes = tuple({None: 0, INHERITED: INHERITED} for _ in range(3))
+
+    def __len__(self):
+        return len(self.loop_start)
+
+    def name_code(self, kind, name):
+        """
+        Returns the code of name (a material, smooth group or object name, for kind 0, 1 and 2),
+        adding it to the names if needed.
+        """
+        codes = self._codes[kind]
+        code = codes.get(name)
+        if code is None:
+            names = (self.material_names, self.smooth_group_names, self.object_names)[kind]
+            code = codes[name] = len(names)
+            names.append(name)
+        return code
+
+    def new_face(self, context_material, context_smooth_group, context_object, flags=0):
+        """
+        Start a new face, its loops are the ones appended to loop_v/loop_vt/loop_vn from now on.
+        Returns its loop_start.
+        """
+        loop_start = len(self.loop_v)
+        self.loop_start.append(loop_start)
+        self.material.append(self.name_code(0, context_material))
+        self.smooth_group.append(self.name_code(1, context_smooth_group))
+        self.object.append(self.name_code(2, context_object))
+        self.flags.append(flags)
+        return loop_start
+
+    def finish(self):
+        """
+        Convert the arrays to numpy ones once all faces are added, and compute loop_total.
+        """
+        for attr in ("loop_v", "loop_vt", "loop_vn", "loop_start", "material", "smooth_group", "object", "flags"):
+            items = getattr(self, attr)
+            setattr(self, attr, np.frombuffer(items, dtype=items.typecode) if items else
+                    np.zeros(0, dtype=items.typecode))
+        self.loop_total = np.diff(np.append(self.loop_start, len(self.loop_v))).astype(np.int32)
+
+    def take(self):
+        """
+        Returns a finished FaceData with the faces added so far, removing them from this one
+        (which keeps sharing its names with the returned one).
+        """
+        taken = FaceData.__new__(FaceData)
+        for attr in ("loop_v", "loop_vt", "loop_vn", "loop_start", "material", "smooth_group", "object", "flags"):
+            items = getattr(self, attr)
+            setattr(taken, attr, array.array(items.typecode, items))
+            del items[:]
+        taken.material_names = self.material_names
+        taken.smooth_group_names = self.smooth_group_names
+        taken.object_names = self.object_names
+        taken._codes = self._codes
+        taken.finish()
+        return taken
+
+    def polygon_material_names(self):
+        """
+        Returns the names of the materials used by faces that give polygons (not polylines, nor faces
+        of less than 3 vertices).
+        """
+        is_poly = (self.loop_total > 2) & ((self.flags & FACE_POLYLINE) == 0)
+        return [self.material_names[code] for code in np.unique(self.material[is_poly]).tolist() if code]
+
+    def face_loops(self, face_indices):
+        """
+        Returns the indices of the loops of the given faces, in that order.
+        """
+        loop_total = self.loop_total[face_indices]
+        new_loop_start = np.cumsum(loop_total) - loop_total
+        return (np.repeat(self.loop_start[face_indices] - new_loop_start, loop_total) +
+                np.arange(loop_total.sum(), dtype=np.int64))
+
+    def subset(self, face_indices):
+        """
+        Returns a FaceData with only the given faces (and their loops), sharing the names.
+        """
+        loop_indices = self.face_loops(face_indices)
+        sub = FaceData.__new__(FaceData)
+        sub.loop_v = self.loop_v[loop_indices]
+        sub.loop_vt = self.loop_vt[loop_indices]
+        sub.loop_vn = self.loop_vn[loop_indices]
+        sub.loop_total = self.loop_total[face_indices]
+        sub.loop_start = (np.cumsum(sub.loop_total) - sub.loop_total).astype(np.int32)
+        sub.material = self.material[face_indices]
+        sub.smooth_group = self.smooth_group[face_indices]
+        sub.object = self.object[face_indices]
+        sub.flags = self.flags[face_indices]
+        sub.material_names = self.material_names
+        sub.smooth_group_names = self.smooth_group_names
+        sub.object_names = self.object_names
+        sub._codes = self._codes
+        return sub
+
+
+class ParsedObj:
+    """
+    Everything read from an obj file, or from a byte range of it (see parse_obj()),
+    before any Blender data is created.
+    """
+    __slots__ = ("verts_loc", "verts_nor", "verts_tex", "verts_col", "faces", "material_libs", "vertex_groups",
+                 "unique_materials", "unique_smooth_groups", "nurbs", "comma_decimal",
+                 "context_state")
+
+
+def parse_obj(filepath, start=0, end=None, *,
+              use_smooth_groups=True,
+              use_edges=True,
+              use_split_objects=True,
+              use_split_groups=True,
+              use_groups_as_vgroups=False,
+              use_bulk_parse=True,
+              comma_decimal=None,
+              object_callback=None,
+              use_spill=False,
+              ):
+    """
+    Parse the obj file, or the data[start:end] byte range of it (start being 0 or just after
+    a line that does not continue on the next one), into a ParsedObj.
+    Does not use bpy, so that ranges can be parsed in other processes (see parse_obj_file()).
+
+    With object_callback (and use_split_objects or use_split_groups), the faces parsed so far are passed
+    to it in a ParsedObj each time the parser moves past an object, and then dropped; the returned ParsedObj
+    only holds the faces of the last object. The v/vn/vt pools are kept, as later objects may still index them,
+    with use_spill the positions and colors are kept in a memory-mapped temporary file.
+
+    comma_decimal tells whether floats use a comma instead of a point, None to find it while reading.
+
+    When start is not 0, what depends on previous ranges is left for merge_parsed_obj() to resolve:
+    the o/g/usemtl/s state in use before the first such statement of the range is INHERITED,
+    and negative (relative) indices are stored in the range's own frame, shifted by REL_INDEX_BIAS.
     """
 
     def handle_vec(line_start, context_multi_line, line_split, tag, data, vec, vec_len):
@@ -1026,88 +2113,136 @@ def load(context,
         if not ret_context_multi_line:
             data.append(tuple(vec[:vec_len]))
 
-         # there is a vcol, hopefully
-        if len(vec) > vec_len:
-            global verts_with_vcol
-            global verts_vcols
-            vert_vector = mathutils.Vector((vec[0], vec[1], vec[2]))
-            verts_with_vcol.append(vert_vector)
-            verts_vcols.append(tuple([vec[3], vec[4], vec[5]]))
+            # there is a vcol, hopefully
+            if tag == b'v' and len(vec) >= vec_len + 3:
+                verts_col.append(tuple(vec[vec_len:vec_len + 3]))
 
         return ret_context_multi_line
 
-    def create_face(context_material, context_smooth_group, context_object):
-        face_vert_loc_indices = []
-        face_vert_nor_indices = []
-        face_vert_tex_indices = []
-        return (
-            face_vert_loc_indices,
-            face_vert_nor_indices,
-            face_vert_tex_indices,
-            context_material,
-            context_smooth_group,
-            context_object,
-            [],  # If non-empty, that face is a Blender-invalid ngon (holes...), need a mutable object for that...
-        )
-
-    with ProgressReport(context.window_manager) as progress:
-        progress.enter_substeps(1, "Importing OBJ with vertex color support %r..." % filepath)
-
-        if global_matrix is None:
-            global_matrix = mathutils.Matrix()
-
-        if use_split_objects or use_split_groups:
-            use_groups_as_vgroups = False
-
-        time_main = time.time()
-
-        verts_loc = []
-        verts_nor = []
-        verts_tex = []
-        faces = []  # tuples of the faces
-        material_libs = set()  # filenames to material libs this OBJ uses
-        vertex_groups = {}  # when use_groups_as_vgroups is true
-
-        # Get the string to float conversion func for this file- is 'float' for almost all files.
-        float_func = get_float_func(filepath)
-
-        # Context variables
-        context_material = None
-        context_smooth_group = None
-        context_object = None
-        context_vgroup = None
-
-        # Nurbs
-        context_nurbs = {}
-        nurbs = []
-        context_parm = b''  # used by nurbs too but could be used elsewhere
-
-        # Until we can use sets
-        unique_materials = {}
-        unique_material_images = {}
-        unique_smooth_groups = {}
-        # unique_obects= {} - no use for this variable since the objects are stored in the face.
-
-        # when there are faces that end with \
-        # it means they are multiline-
-        # since we use xreadline we cant skip to the next line
-        # so we need to know whether
-        context_multi_line = b''
-
-        # Per-face handling data.
-        face_vert_loc_indices = None
-        face_vert_nor_indices = None
-        face_vert_tex_indices = None
-        face_vert_nor_valid = face_vert_tex_valid = False
-        face_items_usage = set()
-        face_invalid_blenpoly = None
-        prev_vidx = None
-        face = None
-        vec = []
+    def flush_vec_runs():
+        for prefix, (tag, data, vec_len) in vec_run_targets.items():
+            vec_run = vec_runs[prefix]
+            if not vec_run:
+                continue
+            block = parse_vec_block(vec_run, tag, vec_len, comma_decimal)
+            if block is None:
+                for line in b'\n'.join(vec_run).split(b'\n'):
+                    line_split = line.split()
+                    if line_split:
+                        handle_vec(tag, b'', line_split, tag, data, vec, vec_len)
+            else:
+                # Positions (or normals, uvs) and colors are views into the same block.
+                data.add_block(block[:, :vec_len])
+                if tag == b'v' and block.shape[1] >= vec_len + 3:
+                    verts_col.add_block(block[:, vec_len:vec_len + 3])
+            vec_run.clear()
+
+    def make_parsed(faces):
+        # Pools are needed again after an object_callback, see VecBuffer.view().
+        vec_array = VecBuffer.to_array if object_callback is None else VecBuffer.view
+        parsed = ParsedObj()
+        parsed.verts_loc = vec_array(verts_loc)
+        parsed.verts_nor = vec_array(verts_nor)
+        parsed.verts_tex = vec_array(verts_tex)
+        parsed.verts_col = vec_array(verts_col)
+        parsed.faces = faces
+        parsed.material_libs = material_libs
+        parsed.vertex_groups = vertex_groups
+        parsed.unique_materials = unique_materials
+        parsed.unique_smooth_groups = unique_smooth_groups
+        parsed.nurbs = nurbs
+        parsed.comma_decimal = comma_decimal if float_func_found else None
+        parsed.context_state = (context_material, context_smooth_group, context_object, context_vgroup)
+        return parsed
+
+    def add_vec_run(block):
+        prefixes = [prefix for prefix in vec_runs if (b'\n' + prefix) in block]
+        if len(prefixes) == 1:
+            vec_runs[prefixes[0]].append(block)
+        else:
+            # Interleaved v/vt/vn lines, keep each kind in its own run.
+            for prefix in prefixes:
+                vec_runs[prefix].append(b''.join(VEC_LINE_RES[prefix].findall(block)))
+
+    verts_loc = VecBuffer(3, use_spill)
+    verts_nor = VecBuffer(3)
+    verts_tex = VecBuffer(2)
+    verts_col = VecBuffer(3, use_spill)  # colors of 'v x y z r g b' lines
+    # Negative indices of a range may not fit in an int, see REL_INDEX_BIAS.
+    faces = FaceData('i' if start == 0 else 'q')
+    loop_v_append = faces.loop_v.append
+    loop_vt_append = faces.loop_vt.append
+    loop_vn_append = faces.loop_vn.append
+    material_libs = set()  # filenames to material libs this OBJ uses
+    vertex_groups = {}  # when use_groups_as_vgroups is true
+
+    # The string to float conversion func for this file- is 'float' for almost all files.
+    # Found from the first vertex line with decimals, while reading the file (see get_float_func()).
+    if comma_decimal is None:
+        float_func = float
+        float_func_found = False
+        comma_decimal = False
+    else:
+        float_func = float_comma if comma_decimal else float
+        float_func_found = True
+
+    # Context variables
+    inherited = None if start == 0 else INHERITED
+    context_material = inherited
+    context_smooth_group = inherited if use_smooth_groups else None
+    context_object = inherited if (use_split_objects or use_split_groups) else None
+    context_vgroup = inherited if use_groups_as_vgroups else None
+    if context_vgroup is INHERITED:
+        vertex_groups[INHERITED] = []
+
+    # Negative indices are resolved against the counts of this range only, see REL_INDEX_BIAS.
+    neg_offset = 1 if start == 0 else 1 + REL_INDEX_BIAS
+
+    # Nurbs
+    context_nurbs = {}
+    nurbs = []
+    context_parm = b''  # used by nurbs too but could be used elsewhere
+
+    # Until we can use sets
+    unique_materials = {}
+    unique_smooth_groups = {}
+    # unique_obects= {} - no use for this variable since the objects are stored in the face.
+
+    # when there are faces that end with \
+    # it means they are multiline-
+    # since we use xreadline we cant skip to the next line
+    # so we need to know whether
+    context_multi_line = b''
+
+    # Per-face handling data.
+    face_loop_start = 0
+    face_vert_nor_valid = face_vert_tex_valid = False
+    face_items_usage = set()
+    face_invalid_blenpoly = False
+    vec = []
+
+    # Bulk parsing of v/vn/vt lines, keyed by line prefix.
+    vec_run_targets = {b'v ': (b'v', verts_loc, 3), b'vn ': (b'vn', verts_nor, 3), b'vt ': (b'vt', verts_tex, 2)}
+    # Raw lines (or blocks of them) of the pending single-line statements, only flushed when another
+    # statement needs the vertex counts, so that files interleaving v/vt/vn lines still get long runs.
+    vec_runs = {prefix: [] for prefix in vec_run_targets}
+
+    with open(filepath, 'rb') as f, map_obj_file(f) as data:
+        for chunk in iter_obj_chunks(data, start, end):
+            if not float_func_found:
+                found_float_func = get_float_func(chunk)
+                if found_float_func is not None:
+                    float_func = found_float_func
+                    comma_decimal = float_func is not float
+                    float_func_found = True
+
+            for line in iter_obj_lines(chunk, use_bulk_parse):
+                if line[:1] == b'\n':
+                    # A whole run of single-line v/vn/vt statements, like handle_vec() it ends any multi-line.
+                    add_vec_run(line)
+                    context_multi_line = b''
+                    continue
 
-        progress.enter_substeps(3, "Parsing OBJ file...")
-        with open(filepath, 'rb') as f:
-            for line in f:  # .readlines():
                 line_split = line.split()
 
                 if not line_split:
@@ -1115,6 +2250,9 @@ def load(context,
 
                 line_start = line_split[0]  # we compare with this a _lot_
 
+                if line_start != b'#' and (vec_runs[b'v '] or vec_runs[b'vn '] or vec_runs[b'vt ']):
+                    flush_vec_runs()
+
                 if line_start == b'v' or context_multi_line == b'v':
                     context_multi_line = handle_vec(line_start, context_multi_line, line_split, b'v', verts_loc, vec, 3)
 
@@ -1130,19 +2268,17 @@ def load(context,
                     if not context_multi_line:
                         line_split = line_split[1:]
                         # Instantiate a face
-                        face = create_face(context_material, context_smooth_group, context_object)
-                        (face_vert_loc_indices, face_vert_nor_indices, face_vert_tex_indices,
-                         _1, _2, _3, face_invalid_blenpoly) = face
-                        faces.append(face)
+                        face_loop_start = faces.new_face(context_material, context_smooth_group, context_object)
                         face_items_usage.clear()
-                    # Else, use face_vert_loc_indices and face_vert_tex_indices previously defined and used the obj_face
+                        face_invalid_blenpoly = False
+                    # Else, keep adding loops to the face started on a previous line
 
                     context_multi_line = b'f' if strip_slash(line_split) else b''
 
                     for v in line_split:
                         obj_vert = v.split(b'/')
                         idx = int(obj_vert[0]) - 1
-                        vert_loc_index = (idx + len(verts_loc) + 1) if (idx < 0) else idx
+                        vert_loc_index = (idx + len(verts_loc) + neg_offset) if (idx < 0) else idx
                         # Add the vertex to the current group
                         # *warning*, this wont work for files that have groups defined around verts
                         if use_groups_as_vgroups and context_vgroup:
@@ -1152,67 +2288,57 @@ def load(context,
                         if not face_invalid_blenpoly:
                             # If we use more than once a same vertex, invalid ngon is suspected.
                             if vert_loc_index in face_items_usage:
-                                face_invalid_blenpoly.append(True)
+                                face_invalid_blenpoly = True
                             else:
                                 face_items_usage.add(vert_loc_index)
-                        face_vert_loc_indices.append(vert_loc_index)
+                        loop_v_append(vert_loc_index)
 
                         # formatting for faces with normals and textures is
                         # loc_index/tex_index/nor_index
                         if len(obj_vert) > 1 and obj_vert[1] and obj_vert[1] != b'0':
                             idx = int(obj_vert[1]) - 1
-                            face_vert_tex_indices.append((idx + len(verts_tex) + 1) if (idx < 0) else idx)
+                            loop_vt_append((idx + len(verts_tex) + neg_offset) if (idx < 0) else idx)
                             face_vert_tex_valid = True
                         else:
-                            face_vert_tex_indices.append(...)
+                            loop_vt_append(-1)
 
                         if len(obj_vert) > 2 and obj_vert[2] and obj_vert[2] != b'0':
                             idx = int(obj_vert[2]) - 1
-                            face_vert_nor_indices.append((idx + len(verts_nor) + 1) if (idx < 0) else idx)
+                            loop_vn_append((idx + len(verts_nor) + neg_offset) if (idx < 0) else idx)
                             face_vert_nor_valid = True
                         else:
-                            face_vert_nor_indices.append(...)
+                            loop_vn_append(-1)
 
                     if not context_multi_line:
-                        # Clear nor/tex indices in case we had none defined for this face.
-                        if not face_vert_nor_valid:
-                            face_vert_nor_indices.clear()
-                        if not face_vert_tex_valid:
-                            face_vert_tex_indices.clear()
+                        # Only use nor/tex indices if we had some defined for this face.
+                        face_flags = 0
+                        if face_vert_nor_valid:
+                            face_flags |= FACE_USE_NOR
+                        if face_vert_tex_valid:
+                            face_flags |= FACE_USE_TEX
                         face_vert_nor_valid = face_vert_tex_valid = False
 
                         # Means we have finished a face, we have to do final check if ngon is suspected to be blender-invalid...
-                        if face_invalid_blenpoly:
-                            face_invalid_blenpoly.clear()
-                            face_items_usage.clear()
-                            prev_vidx = face_vert_loc_indices[-1]
-                            for vidx in face_vert_loc_indices:
-                                edge_key = (prev_vidx, vidx) if (prev_vidx < vidx) else (vidx, prev_vidx)
-                                if edge_key in face_items_usage:
-                                    face_invalid_blenpoly.append(True)
-                                    break
-                                face_items_usage.add(edge_key)
-                                prev_vidx = vidx
+                        if face_invalid_blenpoly and is_invalid_blenpoly(faces.loop_v[face_loop_start:]):
+                            face_flags |= FACE_INVALID_BLENPOLY
+                        faces.flags[-1] = face_flags
 
                 elif use_edges and (line_start == b'l' or context_multi_line == b'l'):
                     # very similar to the face load function above with some parts removed
                     if not context_multi_line:
                         line_split = line_split[1:]
-                        # Instantiate a face
-                        face = create_face(context_material, context_smooth_group, context_object)
-                        face_vert_loc_indices = face[0]
-                        # XXX A bit hackish, we use special 'value' of face_vert_nor_indices (a single True item) to tag this
-                        #     as a polyline, and not a regular face...
-                        face[1][:] = [True]
-                        faces.append(face)
-                    # Else, use face_vert_loc_indices previously defined and used the obj_face
+                        # Instantiate a face, tagged as a polyline, and not a regular face...
+                        faces.new_face(context_material, context_smooth_group, context_object, FACE_POLYLINE)
+                    # Else, keep adding loops to the polyline started on a previous line
 
                     context_multi_line = b'l' if strip_slash(line_split) else b''
 
                     for v in line_split:
                         obj_vert = v.split(b'/')
                         idx = int(obj_vert[0]) - 1
-                        face_vert_loc_indices.append((idx + len(verts_loc) + 1) if (idx < 0) else idx)
+                        loop_v_append((idx + len(verts_loc) + neg_offset) if (idx < 0) else idx)
+                        loop_vt_append(-1)
+                        loop_vn_append(-1)
 
                 elif line_start == b's':
                     if use_smooth_groups:
@@ -1224,11 +2350,15 @@ def load(context,
 
                 elif line_start == b'o':
                     if use_split_objects:
+                        if object_callback is not None and len(faces) and line_value(line_split) != context_object:
+                            object_callback(make_parsed(faces.take()))
                         context_object = line_value(line_split)
                         # unique_obects[context_object]= None
 
                 elif line_start == b'g':
                     if use_split_groups:
+                        if object_callback is not None and len(faces) and line_value(line.split()) != context_object:
+                            object_callback(make_parsed(faces.take()))
                         context_object = line_value(line.split())
                         # print 'context_object', context_object
                         # unique_obects[context_object]= None
@@ -1303,13 +2433,682 @@ def load(context,
                     context_image= line_value(line_split)
                 '''
 
-        progress.step("Done, loading materials and images...")
+        flush_vec_runs()
+    faces.finish()
+    return make_parsed(faces)
 
-        create_materials(filepath, relpath, material_libs, unique_materials,
-                         unique_material_images, use_image_search, use_cycles, float_func)
 
-        progress.step("Done, building geometries (verts:%i faces:%i materials: %i smoothgroups:%i) ..." %
-                      (len(verts_loc), len(faces), len(unique_materials), len(unique_smooth_groups)))
+def _resolve_rel_indices(indices, offset):
+    for i, idx in enumerate(indices):
+        if idx >= REL_INDEX_BIAS // 2:
+            indices[i] = idx - REL_INDEX_BIAS + offset
+
+
+def _resolve_rel_loop_indices(loop_indices, offset):
+    """
+    Returns the (int64) loop_indices of a range as int32, with their relative indices resolved.
+    """
+    loop_indices = loop_indices.astype(np.int64)
+    is_rel = loop_indices >= REL_INDEX_BIAS // 2
+    loop_indices[is_rel] += offset - REL_INDEX_BIAS
+    return loop_indices.astype(np.int32), is_rel
+
+
+def is_invalid_blenpoly(face_vert_loc_indices):
+    """
+    Whether that face is a Blender-invalid ngon (using a same edge more than once), same check as in parse_obj().
+    """
+    if len(set(face_vert_loc_indices)) == len(face_vert_loc_indices):
+        return False
+    edge_users = set()
+    prev_vidx = face_vert_loc_indices[-1]
+    for vidx in face_vert_loc_indices:
+        edge_key = (prev_vidx, vidx) if (prev_vidx < vidx) else (vidx, prev_vidx)
+        if edge_key in edge_users:
+            return True
+        edge_users.add(edge_key)
+        prev_vidx = vidx
+    return False
+
+
+def merge_parsed_obj(parts, starts=None, states=None):
+    """
+    Merge the ParsedObj of consecutive byte ranges of a file (as returned by parse_obj()), in order, so that
+    the result is the same as parsing the whole file at once: relative indices get the v/vt/vn counts of
+    the previous ranges, and INHERITED o/g/usemtl/s state gets the one the previous ranges ended with.
+    For ranges that do not follow each other, starts gives the (v, vt, vn) counts of the file before each
+    one, so that all indices are those of the whole file, and states the state they inherit.
+    """
+    merged = parts[0]
+    faces = FaceData()
+    face_arrays = []
+    nbr_loc = nbr_nor = nbr_tex = nbr_loops = 0
+    state = (None, None, None, None)
+
+    for part_index, part in enumerate(parts):
+        if starts is not None:
+            nbr_loc, nbr_tex, nbr_nor = starts[part_index]
+            state = states[part_index]
+        part_faces = part.faces
+        loop_v, is_rel = _resolve_rel_loop_indices(part_faces.loop_v, nbr_loc)
+        loop_vt = _resolve_rel_loop_indices(part_faces.loop_vt, nbr_tex)[0]
+        loop_vn = _resolve_rel_loop_indices(part_faces.loop_vn, nbr_nor)[0]
+        flags = part_faces.flags.copy()
+
+        # Relative and absolute indices could not be compared while parsing, check those faces again.
+        loop_total = part_faces.loop_total
+        for f_idx in np.unique(np.searchsorted(part_faces.loop_start, np.flatnonzero(is_rel), 'right') - 1):
+            face_flags = int(flags[f_idx])
+            if not face_flags & FACE_POLYLINE:
+                loop_start = part_faces.loop_start[f_idx]
+                face_flags &= ~FACE_INVALID_BLENPOLY
+                if is_invalid_blenpoly(loop_v[loop_start:loop_start + loop_total[f_idx]].tolist()):
+                    face_flags |= FACE_INVALID_BLENPOLY
+                flags[f_idx] = face_flags
+
+        # Codes of this range's names in the merged faces, with an extra last item
+        # so that INHERITED (-1) codes get the one of the state the previous ranges ended with.
+        codes = []
+        for kind, names in enumerate((part_faces.material_names, part_faces.smooth_group_names,
+                                      part_faces.object_names)):
+            inherited_code = faces.name_code(kind, state[kind])
+            code_map = np.array([faces.name_code(kind, name) for name in names] + [inherited_code], dtype=np.int32)
+            codes.append(code_map[(part_faces.material, part_faces.smooth_group, part_faces.object)[kind]])
+
+        face_arrays.append((loop_v, loop_vt, loop_vn, part_faces.loop_start + nbr_loops, *codes, flags))
+        nbr_loops += len(loop_v)
+
+        if part is not merged:
+            for context_vgroup, vgroup_indices in part.vertex_groups.items():
+                _resolve_rel_indices(vgroup_indices, nbr_loc)
+                if context_vgroup == INHERITED:
+                    context_vgroup = state[3]
+                    if not context_vgroup:
+                        continue
+                merged.vertex_groups.setdefault(context_vgroup, []).extend(vgroup_indices)
+
+            for name in part.unique_materials:
+                merged.unique_materials.setdefault(name, None)
+            for name in part.unique_smooth_groups:
+                merged.unique_smooth_groups.setdefault(name, None)
+            merged.material_libs |= part.material_libs
+            merged.nurbs += part.nurbs
+
+        nbr_loc += len(part.verts_loc)
+        nbr_nor += len(part.verts_nor)
+        nbr_tex += len(part.verts_tex)
+        state = tuple(old if new == INHERITED else new for new, old in zip(part.context_state, state))
+
+    (faces.loop_v, faces.loop_vt, faces.loop_vn, faces.loop_start,
+     faces.material, faces.smooth_group, faces.object, faces.flags) = map(np.concatenate, zip(*face_arrays))
+    faces.loop_total = np.concatenate([part.faces.loop_total for part in parts])
+
+    merged.faces = faces
+    merged.verts_loc = np.concatenate([part.verts_loc for part in parts])
+    merged.verts_nor = np.concatenate([part.verts_nor for part in parts])
+    merged.verts_tex = np.concatenate([part.verts_tex for part in parts])
+    merged.verts_col = np.concatenate([part.verts_col for part in parts])
+    merged.context_state = state
+    return merged
+
+
+def split_obj_ranges(data, nbr):
+    """
+    Split data (a whole obj file) in up to nbr (start, end) byte ranges, each starting at the beginning of
+    a line which is not the continuation of a multi-line statement.
+    """
+    size = len(data)
+    bounds = [0]
+    for i in range(1, nbr):
+        pos = data.find(b'\n', max(size * i // nbr, bounds[-1])) + 1
+        # Do not cut in the middle of a multi-line statement (previous line ending with '\').
+        while pos and data[data.rfind(b'\n', 0, pos - 1) + 1:pos].rstrip().endswith(b'\\'):
+            pos = data.find(b'\n', pos) + 1
+        if not pos or pos >= size:
+            break
+        bounds.append(pos)
+    bounds.append(size)
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def find_comma_decimal(data):
+    """
+    Whether floats of data (a whole obj file) use a comma instead of a point (see get_float_func()).
+    """
+    for chunk in iter_obj_chunks(data):
+        found_float_func = get_float_func(chunk)
+        if found_float_func is not None:
+            return found_float_func is float_comma
+    return False
+
+
+def scan_obj_materials(filepath):
+    """
+    Returns the material libs, the (unique) material names and smooth groups used by the obj file, and whether
+    its floats use a comma, from a quick scan of its usemtl/mtllib/s lines instead of parsing it,
+    so that materials can be created (and meshes know whether the file has smooth groups) before it is parsed.
+    """
+    material_libs = set()
+    unique_materials = {}
+    unique_smooth_groups = {}
+    with open(filepath, 'rb') as f, map_obj_file(f) as data:
+        comma_decimal = find_comma_decimal(data)
+        for line in MATERIAL_LINE_RE.finditer(data):
+            line_split = line.group().split()
+            if line_split[0] == b'usemtl':
+                unique_materials[line_value(line_split)] = None
+            elif line_split[0] == b's':
+                smooth_group = line_value(line_split)
+                if smooth_group and smooth_group != b'off':
+                    unique_smooth_groups[smooth_group] = None
+            else:
+                material_libs |= {os.fsdecode(f) for f in line_split[1:]}
+    return material_libs, unique_materials, unique_smooth_groups, comma_decimal
+
+
+class ObjIndex:
+    """
+    The o/g/usemtl/s/mtllib statements of an obj file: byte offset of their line, numbers of v, vt and vn
+    statements before it, keyword and value, with the size and modification time of the file.
+    Made by scanning the file, or read back from its sidecar file, see get_obj_index().
+    """
+    __slots__ = ("size", "mtime_ns", "comma_decimal", "offsets", "counts", "kinds", "values")
+
+    def __init__(self, filepath):
+        stat = os.stat(filepath)
+        self.size = stat.st_size
+        self.mtime_ns = stat.st_mtime_ns
+        self.offsets = []
+        self.counts = []
+        self.kinds = []
+        self.values = []
+        counts = np.zeros(3, dtype=np.int64)
+        start = 0
+        with open(filepath, 'rb') as f, map_obj_file(f) as data:
+            self.comma_decimal = find_comma_decimal(data)
+            for chunk in iter_obj_chunks(data):
+                # Chunks start with the newline before their first line, see iter_obj_chunks().
+                vec_starts = self._vec_starts(chunk)
+                for line in OBJ_INDEX_LINE_RE.finditer(chunk):
+                    self.offsets.append(start + line.start())
+                    self.counts.append(tuple((counts + [np.searchsorted(kind_starts, line.start())
+                                                        for kind_starts in vec_starts]).tolist()))
+                    self.kinds.append(line.group(1))
+                    self.values.append(line_value(line.group().split()))
+                counts += [len(kind_starts) for kind_starts in vec_starts]
+                start += len(chunk) - 1
+        # Totals of the file, at its end.
+        self.counts.append(tuple(counts.tolist()))
+
+    @staticmethod
+    def _vec_starts(chunk):
+        """
+        Returns the (sorted) positions in chunk of the v, vt and vn statements, found from the bytes after each newline.
+        """
+        chunk_array = np.frombuffer(chunk, dtype=np.uint8)
+        line_starts = np.flatnonzero(chunk_array[:-3] == ord('\n')) + 1
+        line_starts = line_starts[chunk_array[line_starts] == ord('v')]
+        second = chunk_array[line_starts + 1]
+        is_blank = lambda char: (char == ord(' ')) | (char == ord('\t'))
+        third_is_blank = is_blank(chunk_array[line_starts + 2])
+        vec_starts = [line_starts[is_blank(second)],
+                      line_starts[(second == ord('t')) & third_is_blank],
+                      line_starts[(second == ord('n')) & third_is_blank]]
+        indented = [(line.start() + 1, line.group(1)) for line in OBJ_INDEX_INDENTED_VEC_RE.finditer(chunk)]
+        if indented:
+            for kind, tag in enumerate((b'v', b'vt', b'vn')):
+                vec_starts[kind] = np.sort(np.append(vec_starts[kind], [pos for pos, line_tag in indented
+                                                                        if line_tag == tag]))
+        return vec_starts
+
+    def is_current(self, filepath):
+        stat = os.stat(filepath)
+        return (self.size, self.mtime_ns) == (stat.st_size, stat.st_mtime_ns)
+
+    def write(self, index_path):
+        index = {
+            "version": OBJ_INDEX_VERSION,
+            "size": self.size,
+            "mtime_ns": self.mtime_ns,
+            "comma_decimal": self.comma_decimal,
+            "statements": [[offset, counts, kind.decode('latin-1'), value]
+                           for offset, counts, kind, value in zip(self.offsets, self.counts, self.kinds,
+                                                                  _names_to_json(self.values))],
+            "counts": self.counts[-1],
+        }
+        with open(index_path, 'w') as f:
+            json.dump(index, f, separators=(',', ':'))
+
+    @staticmethod
+    def read(index_path):
+        """
+        Returns the ObjIndex written to index_path, or None if there is none (of this version).
+        """
+        try:
+            with open(index_path, 'r') as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if index.get("version") != OBJ_INDEX_VERSION:
+            return None
+        obj_index = ObjIndex.__new__(ObjIndex)
+        obj_index.size = index["size"]
+        obj_index.mtime_ns = index["mtime_ns"]
+        obj_index.comma_decimal = index["comma_decimal"]
+        obj_index.offsets = [offset for offset, _counts, _kind, _value in index["statements"]]
+        obj_index.counts = [tuple(counts) for _offset, counts, _kind, _value in index["statements"]]
+        obj_index.counts.append(tuple(index["counts"]))
+        obj_index.kinds = [kind.encode('latin-1') for _offset, _counts, kind, _value in index["statements"]]
+        obj_index.values = _names_from_json(value for _offset, _counts, _kind, value in index["statements"])
+        return obj_index
+
+    def material_libs(self):
+        return {os.fsdecode(f) for kind, value in zip(self.kinds, self.values) if kind == b'mtllib' and value
+                for f in value.split()}
+
+    def object_ranges(self, is_selected, use_split_objects=True, use_split_groups=True, use_smooth_groups=True):
+        """
+        Returns the (start, end) byte ranges of the objects (o or g statements, as split) whose name is_selected(),
+        each with the (v, vt, vn) counts before it and the (usemtl, s, o/g, vertex group) state it starts with.
+        """
+        ranges = []
+        state = (None, None, None, None)
+        for i, (offset, kind, value) in enumerate(zip(self.offsets, self.kinds, self.values)):
+            material, smooth_group, obj, _vgroup = prev_state = state
+            if kind == b'usemtl':
+                material = value
+            elif kind == b's' and use_smooth_groups:
+                smooth_group = None if value == b'off' else value
+            elif (kind == b'o' and use_split_objects) or (kind == b'g' and use_split_groups):
+                obj = value
+            state = (material, smooth_group, obj, None)
+            if obj is None or not is_selected(obj.decode('utf-8', 'replace')):
+                continue
+            end = self.offsets[i + 1] if i + 1 < len(self.offsets) else self.size
+            if ranges and ranges[-1][1] == offset:
+                ranges[-1][1] = end
+            else:
+                ranges.append([offset, end, self.counts[i], prev_state])
+        return [tuple(obj_range) for obj_range in ranges]
+
+    def vec_ranges(self, kind, indices):
+        """
+        Returns the (start, end) byte ranges between two statements of the index holding the v (kind 0),
+        vt (1) or vn (2) statements of those (0-based, sorted) indices, each with the (v, vt, vn) counts before it.
+        """
+        counts_before = np.array([0] + [counts[kind] for counts in self.counts[:-1]], dtype=np.int64)
+        ranges = []
+        for i in np.unique(np.searchsorted(counts_before, indices, 'right') - 1).tolist():
+            start = self.offsets[i - 1] if i else 0
+            end = self.offsets[i] if i < len(self.offsets) else self.size
+            ranges.append((start, end, self.counts[i - 1] if i else (0, 0, 0)))
+        return ranges
+
+
+def get_obj_index(filepath):
+    """
+    Returns the ObjIndex of the obj file, read from its sidecar file (filepath + OBJ_INDEX_SUFFIX)
+    unless the obj file changed since, else scanned again and written there.
+    """
+    index_path = filepath + OBJ_INDEX_SUFFIX
+    obj_index = ObjIndex.read(index_path)
+    if obj_index is None or not obj_index.is_current(filepath):
+        obj_index = ObjIndex(filepath)
+        try:
+            obj_index.write(index_path)
+        except OSError as e:
+            print("\tCould not write obj index %r (%s)" % (index_path, e))
+    return obj_index
+
+
+def parse_obj_file(filepath, parse_workers=1, **parse_options):
+    """
+    Parse the whole obj file (see parse_obj()) into a ParsedObj.
+    With parse_workers > 1 (0 for all cores), byte ranges of big files are parsed in that many processes and
+    merged back in order; only for platforms that fork processes, and files without free-form curves.
+    """
+    if parse_workers != 1:
+        import multiprocessing
+        if multiprocessing.get_start_method() != 'fork':
+            print("\tParallel parsing needs forked processes, parsing in a single one.")
+            parse_workers = 1
+        elif parse_workers <= 0:
+            parse_workers = os.cpu_count() or 1
+
+    if parse_workers != 1:
+        with open(filepath, 'rb') as f, map_obj_file(f) as data:
+            nbr_ranges = min(parse_workers * 4, len(data) // PARALLEL_MIN_RANGE)
+            # Nurbs statements can span ranges, keep these (rare) files serial.
+            if nbr_ranges > 1 and data.find(b'cstype') == -1:
+                # Use the same float format for all ranges.
+                comma_decimal = find_comma_decimal(data)
+                ranges = split_obj_ranges(data, nbr_ranges)
+            else:
+                ranges = None
+
+        if ranges:
+            import concurrent.futures
+            with concurrent.futures.ProcessPoolExecutor(max_workers=parse_workers) as executor:
+                futures = [executor.submit(parse_obj, filepath, start, end, comma_decimal=comma_decimal,
+                                           **parse_options)
+                           for start, end in ranges]
+                parts = [future.result() for future in futures]
+            return merge_parsed_obj(parts)
+
+    return parse_obj(filepath, **parse_options)
+
+
+def parse_obj_objects(filepath, obj_index, object_names, **parse_options):
+    """
+    Parse only the objects of the obj file named in object_names (a list, or an fnmatch pattern), from the byte
+    ranges given by its ObjIndex (see ObjIndex.object_ranges()), into a ParsedObj.
+    Indices are resolved with the v/vt/vn counts of the index, and the v/vt/vn statements of other ranges
+    used by their faces are parsed too. Free-form curves are left out.
+    """
+    if isinstance(object_names, str):
+        def is_selected(name):
+            return fnmatch.fnmatchcase(name, object_names)
+    else:
+        object_names = set(object_names)
+        is_selected = object_names.__contains__
+    ranges = obj_index.object_ranges(is_selected,
+                                     use_split_objects=parse_options.get("use_split_objects", True),
+                                     use_split_groups=parse_options.get("use_split_groups", True),
+                                     use_smooth_groups=parse_options.get("use_smooth_groups", True))
+    if not ranges:
+        print("\tWarning, no object matches %r" % (object_names,))
+        return parse_obj(filepath, 0, 0, **parse_options)
+
+    parts = [parse_obj(filepath, start, end, comma_decimal=obj_index.comma_decimal, **parse_options)
+             for start, end, _counts, _state in ranges]
+    merged = merge_parsed_obj(parts, [counts for _start, _end, counts, _state in ranges],
+                              [state for _start, _end, _counts, state in ranges])
+    faces = merged.faces
+    if merged.nurbs:
+        print("\tWarning, free-form curves are not imported with a selection of objects")
+        merged.nurbs = []
+    for material, smooth_group, _obj, _vgroup in (state for _start, _end, _counts, state in ranges):
+        if material is not None:
+            merged.unique_materials.setdefault(material, None)
+        if smooth_group is not None:
+            merged.unique_smooth_groups.setdefault(smooth_group, None)
+    merged.material_libs = obj_index.material_libs()
+
+    # Vectors of each range (or other parsed one) by their first index in the file, for each kind.
+    vecs = [(counts, part) for (_start, _end, counts, _state), part in zip(ranges, parts)]
+    loop_indices = [faces.loop_v, faces.loop_vt, faces.loop_vn]
+    pools = ("verts_loc", "verts_tex", "verts_nor")
+    other_ranges = set()
+    for kind, pool in enumerate(pools):
+        used = np.unique(loop_indices[kind][loop_indices[kind] >= 0])
+        is_parsed = np.zeros(len(used), dtype=bool)
+        for counts, part in vecs:
+            is_parsed |= (used >= counts[kind]) & (used < counts[kind] + len(getattr(part, pool)))
+        other_ranges.update(obj_index.vec_ranges(kind, used[~is_parsed]))
+    for start, end, counts in sorted(other_ranges):
+        vecs.append((counts, parse_obj(filepath, start, end, comma_decimal=obj_index.comma_decimal, **parse_options)))
+
+    # Indices of the file made indices of the pools, made of the vectors in the file order.
+    use_verts_col = all(len(part.verts_col) == len(part.verts_loc) for _counts, part in vecs)
+    for kind, pool in enumerate(pools):
+        # An empty one first when two start at the same index.
+        kind_vecs = sorted(((counts[kind], getattr(part, pool), part.verts_col) for counts, part in vecs),
+                           key=lambda kind_vec: (kind_vec[0], len(kind_vec[1])))
+        vec_start = np.array([start for start, _vec, _col in kind_vecs], dtype=np.int64)
+        vec_total = np.array([len(vec) for _start, vec, _col in kind_vecs], dtype=np.int64)
+        setattr(merged, pool, np.concatenate([vec for _start, vec, _col in kind_vecs]))
+        if pool == "verts_loc":
+            merged.verts_col = np.concatenate([col if use_verts_col else col[:0] for _start, _vec, col in kind_vecs])
+
+        indices = loop_indices[kind].astype(np.int64)
+        is_used = indices >= 0
+        vec_index = np.maximum(np.searchsorted(vec_start, indices[is_used], 'right') - 1, 0)
+        pool_indices = indices[is_used] - vec_start[vec_index]
+        # Indices past the end of the file stay invalid.
+        pool_indices[(pool_indices < 0) | (pool_indices >= vec_total[vec_index])] = len(getattr(merged, pool))
+        indices[is_used] = pool_indices + (np.cumsum(vec_total) - vec_total)[vec_index]
+        loop_indices[kind] = indices.astype(np.int32)
+    faces.loop_v, faces.loop_vt, faces.loop_vn = loop_indices
+    return merged
+
+
+def parse_cache_path(cache_dir, filepath, parse_options):
+    """
+    Returns the path of the parse cache file of that obj file (at its current size and mtime),
+    when parsed with those options.
+    """
+    stat = os.stat(filepath)
+    key = repr((PARSE_CACHE_VERSION, os.path.realpath(filepath), stat.st_size, stat.st_mtime_ns,
+                sorted(parse_options.items())))
+    return os.path.join(cache_dir, hashlib.sha1(key.encode('utf-8', 'surrogateescape')).hexdigest() + ".npz")
+
+
+def _names_to_json(names):
+    return [None if name is None else name.decode('latin-1') for name in names]
+
+
+def _names_from_json(names):
+    return [None if name is None else name.encode('latin-1') for name in names]
+
+
+def save_parse_cache(cache_path, parsed, max_size):
+    """
+    Write parsed (a whole file's ParsedObj) to cache_path, then remove the least recently used
+    cache files of that directory until they take at most max_size bytes.
+    Files with nurbs are not cached.
+    """
+
+    if parsed.nurbs:
+        return
+    cache_dir = os.path.dirname(cache_path)
+    os.makedirs(cache_dir, exist_ok=True)
+
+    faces = parsed.faces
+    vertex_groups = list(parsed.vertex_groups.items())
+    meta = {
+        "material_libs": sorted(parsed.material_libs),
+        "unique_materials": _names_to_json(parsed.unique_materials),
+        "unique_smooth_groups": _names_to_json(parsed.unique_smooth_groups),
+        "material_names": _names_to_json(faces.material_names),
+        "smooth_group_names": _names_to_json(faces.smooth_group_names),
+        "object_names": _names_to_json(faces.object_names),
+        "vertex_group_names": _names_to_json(name for name, _indices in vertex_groups),
+        "comma_decimal": bool(parsed.comma_decimal),
+    }
+    arrays = {attr: getattr(faces, attr) for attr in FACE_ARRAYS}
+    arrays.update(
+        verts_loc=parsed.verts_loc,
+        verts_nor=parsed.verts_nor,
+        verts_tex=parsed.verts_tex,
+        verts_col=parsed.verts_col,
+        vertex_group_indices=np.array([idx for _name, indices in vertex_groups for idx in indices], dtype=np.int64),
+        vertex_group_total=np.array([len(indices) for _name, indices in vertex_groups], dtype=np.int64),
+        meta=np.frombuffer(json.dumps(meta).encode('utf-8'), dtype=np.uint8),
+    )
+
+    # Written under a temporary name first, so that an interrupted write is never read back.
+    fd, tmp_path = tempfile.mkstemp(suffix=".tmp", dir=cache_dir)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            np.savez(f, **arrays)
+        os.replace(tmp_path, cache_path)
+    except:
+        os.remove(tmp_path)
+        raise
+
+    # Least recently used (written or read, see load_parse_cache()) first.
+    cache_files = []
+    for entry in os.scandir(cache_dir):
+        if entry.name.endswith(".npz"):
+            stat = entry.stat()
+            cache_files.append((stat.st_mtime, stat.st_size, entry.path))
+    cache_files.sort()
+    cache_size = sum(size for _mtime, size, _path in cache_files)
+    for _mtime, size, path in cache_files:
+        if cache_size <= max_size:
+            break
+        with contextlib.suppress(OSError):
+            os.remove(path)
+        cache_size -= size
+
+
+def load_parse_cache(cache_path):
+    """
+    Returns the ParsedObj saved in cache_path by save_parse_cache(), or None if there is none.
+    """
+
+    if not os.path.exists(cache_path):
+        return None
+    try:
+        with np.load(cache_path, allow_pickle=False) as data:
+            arrays = {name: data[name] for name in data.files}
+        meta = json.loads(arrays["meta"].tobytes().decode('utf-8'))
+    except Exception as e:
+        print("\tCould not read parse cache %r (%s), parsing the file" % (cache_path, e))
+        return None
+    # Touched, so that it is the most recently used one.
+    with contextlib.suppress(OSError):
+        os.utime(cache_path)
+
+    faces = FaceData()
+    for attr in FACE_ARRAYS:
+        setattr(faces, attr, arrays[attr])
+    faces.material_names = _names_from_json(meta["material_names"])
+    faces.smooth_group_names = _names_from_json(meta["smooth_group_names"])
+    faces.object_names = _names_from_json(meta["object_names"])
+    faces._codes = tuple({name: code for code, name in enumerate(names)}
+                         for names in (faces.material_names, faces.smooth_group_names, faces.object_names))
+
+    vertex_group_ends = np.cumsum(arrays["vertex_group_total"]).tolist()
+    vertex_group_indices = arrays["vertex_group_indices"].tolist()
+
+    parsed = ParsedObj()
+    parsed.verts_loc = arrays["verts_loc"]
+    parsed.verts_nor = arrays["verts_nor"]
+    parsed.verts_tex = arrays["verts_tex"]
+    parsed.verts_col = arrays["verts_col"]
+    parsed.faces = faces
+    parsed.material_libs = set(meta["material_libs"])
+    parsed.vertex_groups = {name: vertex_group_indices[end - total:end] for name, total, end in
+                            zip(_names_from_json(meta["vertex_group_names"]),
+                                arrays["vertex_group_total"].tolist(), vertex_group_ends)}
+    parsed.unique_materials = dict.fromkeys(_names_from_json(meta["unique_materials"]))
+    parsed.unique_smooth_groups = dict.fromkeys(_names_from_json(meta["unique_smooth_groups"]))
+    parsed.nurbs = []
+    parsed.comma_decimal = meta["comma_decimal"]
+    parsed.context_state = None
+    return parsed
+
+
+def load(context,
+         filepath,
+         *,
+         global_clamp_size=0.0,
+         use_smooth_groups=True,
+         use_edges=True,
+         use_split_objects=True,
+         use_split_groups=True,
+         use_image_search=True,
+         use_groups_as_vgroups=False,
+         use_cycles=True,
+         relpath=None,
+         global_matrix=None,
+         use_bulk_parse=True,
+         use_parallel_parse=False,
+         parse_workers=0,
+         use_parse_cache=False,
+         parse_cache_dir=PARSE_CACHE_DIR,
+         parse_cache_max_size=PARSE_CACHE_MAX_SIZE,
+         use_streaming=False,
+         use_stream_spill=False,
+         use_lazy_materials=False,
+         use_material_reuse=False,
+         use_mesh_dedup=False,
+         mesh_dedup_tolerance=1e-4,
+         use_weld=False,
+         weld_tolerance=1e-4,
+         weld_rule='FIRST',
+         use_point_cloud=False,
+         point_cloud_step=1,
+         point_cloud_voxel_size=0.0,
+         use_point_colors=False,
+         chunk_max_verts=0,
+         object_names=None,
+         crop_box=None,
+         crop_box_space='FILE',
+         use_update=False,
+         profile=None,
+         profile_log=None,
+         ):
+    """
+    Called by the user interface or another script.
+    load_obj(path) - should give acceptable results.
+    This function passes the file and sends the data off
+        to be split into objects and then converted into mesh objects
+
+    The file is memory-mapped and read in large chunks (see iter_obj_chunks()).
+    With use_bulk_parse, each run of consecutive single-line v/vn/vt statements is converted
+    in one step to a float32 array (see parse_vec_block()), instead of one line at a time.
+    With use_parallel_parse, big files are parsed by parse_workers processes (0 for all cores),
+    see parse_obj_file(); only building Blender data happens in this one.
+    With use_parse_cache, the parsed data is saved in parse_cache_dir (keeping at most parse_cache_max_size
+    bytes of the most recently used files), and read back instead of parsing the file again
+    as long as it keeps the same size and modification time.
+    With use_streaming (when splitting objects or groups), the meshes of each object are built and added
+    to the scene as soon as it is parsed, instead of once the whole file is in memory (an object that
+    appears again later in the file gives another mesh). With use_stream_spill, vertex positions and
+    colors are also kept in a memory-mapped temporary file, see parse_obj(); use_parse_cache is then ignored.
+    With use_lazy_materials, materials (and their textures and images) are only made when a face that
+    gives a polygon uses them, instead of for every usemtl statement.
+    The mtl files are only read again when they changed since an earlier import (see get_mtl_materials()),
+    and with use_material_reuse, the materials made by an earlier import from the same definitions are used again.
+    With use_mesh_dedup (when splitting objects or groups), objects of a same shape (see mesh_fingerprint(),
+    vertex positions may differ by mesh_dedup_tolerance) share a mesh, each one placed by its own translation.
+    With use_weld, the vertices of each mesh closer than weld_tolerance are merged, their positions, colors and
+    normals being those of the first one with weld_rule 'FIRST', their average with 'AVERAGE' (see weld_vertices()),
+    a weld_tolerance of 0 only merging vertices at the same position.
+    With use_point_cloud (use_streaming is then ignored), a file without faces nor lines gives a mesh of its
+    vertices only, with their colors in a color attribute of the vertices (see create_point_cloud()),
+    keeping one of every point_cloud_step of them and, with point_cloud_voxel_size, one per cell of a grid of
+    that size (see downsample_points()).
+    With use_point_colors (since Blender 2.92), vertex colors are kept once per vertex in a byte color attribute,
+    instead of once per face corner in a vertex color layer (or in a float color attribute for point clouds).
+    With chunk_max_verts, meshes (and point clouds) of more vertices are split in parts of at most that many,
+    next to each other (see chunk_mesh()).
+    With object_names (a list of names, or an fnmatch pattern of them, when splitting objects or groups), only
+    those objects are parsed, from the byte ranges given by the index of the file, written next to it
+    (see get_obj_index(), parse_obj_objects()); use_streaming, use_parse_cache and use_parallel_parse are ignored.
+    With crop_box ((min x, y, z), (max x, y, z)), only the faces whose vertices are all inside that box
+    (of the file positions with crop_box_space 'FILE', of those transformed by global_matrix with 'GLOBAL')
+    and the vertices they use are kept, before any mesh is made (see crop_to_box()).
+    With use_update, the mesh objects made get custom properties identifying them and their data (see mesh_hash());
+    importing the same file again with use_update then keeps the objects of an earlier import whose data is the
+    same, gives the others their new mesh (see replace_object_mesh()) and removes those no longer in the file
+    (unless object_names or crop_box leave some out), only adding the new ones to the scene
+    (use_mesh_dedup is then ignored, use_material_reuse is implied, nurbs are always added).
+    The time and memory used by each phase of the import are measured in profile (an ImportProfile),
+    whose report() is also appended to the JSON-lines file profile_log if given.
+    """
+    if weld_tolerance < 0.0:
+        raise ValueError("weld_tolerance must not be negative, not %r" % weld_tolerance)
+    if point_cloud_voxel_size < 0.0:
+        raise ValueError("point_cloud_voxel_size must not be negative, not %r" % point_cloud_voxel_size)
+    if crop_box_space not in {'FILE', 'GLOBAL'}:
+        raise ValueError("crop_box_space must be 'FILE' or 'GLOBAL', not %r" % crop_box_space)
+
+    if profile is None:
+        profile = ImportProfile(use_tracemalloc=profile_log is not None)
+    profile.info.update(filepath=filepath, date=time.strftime("%Y-%m-%d %H:%M:%S"),
+                        file_size=os.path.getsize(filepath))
+
+    with ProgressReport(context.window_manager) as progress, profile.tracing(), profile.phase("import"):
+        progress.enter_substeps(1, "Importing OBJ with vertex color support %r..." % filepath)
+
+        if global_matrix is None:
+            global_matrix = mathutils.Matrix()
+
+        if use_split_objects or use_split_groups:
+            use_groups_as_vgroups = False
 
         # deselect all
         if bpy.ops.object.select_all.poll():
@@ -1317,40 +3116,322 @@ def load(context,
 
         scene = context.scene
         new_objects = []  # put new objects here
+        unique_meshes = {}  # lists of (positions, mesh) by mesh_fingerprint() key, with use_mesh_dedup
+        unique_material_images = {}
+        context_imagepath_map = {}
 
         # Split the mesh by objects/materials, may
         SPLIT_OB_OR_GROUP = bool(use_split_objects or use_split_groups)
+        use_mesh_dedup = use_mesh_dedup and SPLIT_OB_OR_GROUP and not use_update
+        # Else each update would make another copy of the materials, unused by the objects kept.
+        use_material_reuse = use_material_reuse or use_update
+        if object_names is not None and not SPLIT_OB_OR_GROUP:
+            print("\tObjects can only be selected when splitting objects or groups, importing all of them")
+            object_names = None
+        use_streaming = use_streaming and SPLIT_OB_OR_GROUP and not use_point_cloud and object_names is None
+
+        # With use_update, the objects of an earlier import of the file by their key, until they are met again.
+        source = os.path.abspath(filepath)
+        previous_objects = {}
+        if use_update:
+            previous_objects = {ob.get(OBJECT_KEY_PROP): ob for ob in scene.objects
+                                if ob.get(OBJECT_SOURCE_PROP) == source}
+        object_key_counts = {}
+
+        def previous_object(dataname):
+            # The key of the next object named dataname, and the object of an earlier import with that key.
+            key_count = object_key_counts[dataname] = object_key_counts.get(dataname, 0) + 1
+            object_key = dataname if key_count == 1 else "%s#%i" % (dataname, key_count)
+            return object_key, previous_objects.pop(object_key, None)
+
+        def update_object(objects, previous_ob, object_key, object_hash):
+            # Tag the object just made (the last one of objects), or give its mesh to previous_ob instead.
+            ob = objects[-1]
+            if previous_ob is not None:
+                replace_object_mesh(previous_ob, objects.pop())
+                ob = previous_ob
+                profile.count("updated_objects")
+            ob[OBJECT_SOURCE_PROP] = source
+            ob[OBJECT_KEY_PROP] = object_key
+            ob[OBJECT_HASH_PROP] = object_hash
+
+        def link_objects(objects, offsets=None):
+            for i, obj in enumerate(objects):
+                base = scene.objects.link(obj)
+                base.select = True
+
+                # we could apply this anywhere before scaling.
+                if offsets is None:
+                    obj.matrix_world = global_matrix
+                else:
+                    obj.matrix_world = global_matrix * mathutils.Matrix.Translation(offsets[i])
+            new_objects.extend(objects)
+
+        def create_used_materials(faces):
+            # The materials not made yet of the polygons of faces, see use_lazy_materials.
+            used_materials = {name: None for name in faces.polygon_material_names()
+                              if unique_materials.get(name) is None}
+            if used_materials:
+                with profile.phase("materials"):
+                    create_materials(filepath, relpath, material_libs, used_materials, unique_material_images,
+                                     use_image_search, use_cycles, float_func, profile, context_imagepath_map,
+                                     use_material_reuse)
+                unique_materials.update(used_materials)
+
+        warned_verts_col = []  # once per import, not for each streamed object
+
+        def cropped(parsed, use_loose_verts):
+            # The vertices (with their colors), faces and vertex groups of parsed kept by crop_box.
+            verts_col = parsed.verts_col
+            if len(verts_col) and len(verts_col) != len(parsed.verts_loc):
+                if not warned_verts_col:
+                    print("\tWarning, only %i of %i vertices have a color, ignoring vertex colors" %
+                          (len(verts_col), len(parsed.verts_loc)))
+                    warned_verts_col.append(True)
+                verts_col = verts_col[:0]
+            if crop_box is None:
+                return parsed.verts_loc, verts_col, parsed.faces, parsed.vertex_groups
+
+            with profile.phase("crop"):
+                matrix = None
+                if crop_box_space == 'GLOBAL':
+                    matrix = np.array([tuple(global_matrix[row]) for row in range(4)], dtype=np.float64)
+                verts_loc, verts_col, faces, vertex_groups = crop_to_box(parsed.verts_loc, verts_col, parsed.faces,
+                                                                         parsed.vertex_groups, crop_box[0],
+                                                                         crop_box[1], matrix, use_loose_verts)
+            profile.count("cropped_faces", len(parsed.faces) - len(faces))
+            return verts_loc, verts_col, faces, vertex_groups
+
+        def build_meshes(parsed):
+            # Loose vertices are only kept when split_mesh() does.
+            verts_loc, verts_col, faces, all_vertex_groups = cropped(parsed, not SPLIT_OB_OR_GROUP or
+                                                                     not len(parsed.faces))
+            if SPLIT_OB_OR_GROUP and len(parsed.faces) and not len(faces):
+                # All faces are out of crop_box, split_mesh() would give an empty mesh.
+                return
+            if use_lazy_materials:
+                create_used_materials(faces)
+
+            objects = []
+            offsets = []
+            with profile.phase("split"):
+                split = split_mesh(verts_loc, verts_col, faces, unique_materials, filepath, SPLIT_OB_OR_GROUP)
+            del verts_loc, verts_col, faces
+            for data in split:
+                (verts_loc_split, verts_col_split, faces_split, unique_materials_split, dataname,
+                 use_vnor, use_vtex) = data
+                if use_lazy_materials:
+                    # Leave out the materials of faces that give no polygon.
+                    unique_materials_split = {name: material for name, material in unique_materials_split.items()
+                                              if material is not None}
+                verts_nor_split = parsed.verts_nor if use_vnor else []
+                verts_tex_split = parsed.verts_tex if use_vtex else []
+                vertex_groups = all_vertex_groups
+                if use_weld:
+                    with profile.phase("weld"):
+                        (verts_loc_split, verts_nor_split, verts_col_split, faces_split, vertex_groups,
+                         nbr_welded) = weld_vertices(verts_loc_split, verts_nor_split, verts_col_split, faces_split,
+                                                     vertex_groups, weld_tolerance, weld_rule)
+                    profile.count("welded_vertices", nbr_welded)
+                chunks = [(verts_loc_split, verts_col_split, faces_split, unique_materials_split, vertex_groups,
+                           dataname)]
+                if chunk_max_verts and len(verts_loc_split) > chunk_max_verts:
+                    with profile.phase("chunk"):
+                        chunks = chunk_mesh(verts_loc_split, verts_col_split, faces_split, unique_materials_split,
+                                            vertex_groups, dataname, chunk_max_verts)
+                    profile.count("chunks", len(chunks))
+                for (verts_loc_split, verts_col_split, faces_split, unique_materials_split, vertex_groups,
+                     dataname) in chunks:
+                    if use_update:
+                        with profile.phase("update"):
+                            object_key, previous_ob = previous_object(dataname)
+                            object_hash = mesh_hash(verts_loc_split, verts_nor_split, verts_tex_split,
+                                                    verts_col_split, faces_split, vertex_groups,
+                                                    (use_edges, use_point_colors))
+                        if previous_ob is not None and previous_ob.get(OBJECT_HASH_PROP) == object_hash:
+                            profile.count("unchanged_objects")
+                            continue
+
+                    offset = (0.0, 0.0, 0.0)
+                    if use_mesh_dedup:
+                        with profile.phase("dedup"):
+                            key, verts_loc_local, offset = mesh_fingerprint(verts_loc_split, verts_nor_split,
+                                                                            verts_tex_split, verts_col_split,
+                                                                            faces_split, unique_materials_split)
+                            same_shapes = unique_meshes.setdefault(key, [])
+                            me = next((me for shape_verts_loc, me in same_shapes
+                                       if np.allclose(shape_verts_loc, verts_loc_local,
+                                                      rtol=0.0, atol=mesh_dedup_tolerance)), None)
+                        offsets.append(offset)
+                        if me is not None:
+                            objects.append(bpy.data.objects.new(dataname, me))
+                            profile.count("instanced_objects")
+                            continue
+                        verts_loc_split = verts_loc_local.astype(verts_loc_split.dtype)
+
+                    # Create meshes from the data, warning 'vertex_groups' wont support splitting
+                    #~ print(dataname, use_vnor, use_vtex)
+                    with profile.phase("mesh", per_call=True) as record:
+                        create_mesh(objects,
+                                    use_edges,
+                                    verts_loc_split,
+                                    verts_nor_split,
+                                    verts_tex_split,
+                                    verts_col_split,
+                                    faces_split,
+                                    unique_materials_split,
+                                    unique_material_images,
+                                    unique_smooth_groups,
+                                    vertex_groups,
+                                    dataname,
+                                    profile,
+                                    use_point_colors,
+                                    )
+                    record.update(name=dataname, vertices=len(verts_loc_split), faces=len(faces_split),
+                                  colored_vertices=len(verts_col_split))
+                    if use_update:
+                        update_object(objects, previous_ob, object_key, object_hash)
+                    if use_mesh_dedup:
+                        same_shapes.append((verts_loc_local, objects[-1].data))
+            del split
+            link_objects(objects, offsets if use_mesh_dedup else None)
 
-        for data in split_mesh(verts_loc, faces, unique_materials, filepath, SPLIT_OB_OR_GROUP):
-            verts_loc_split, faces_split, unique_materials_split, dataname, use_vnor, use_vtex = data
-            # Create meshes from the data, warning 'vertex_groups' wont support splitting
-            #~ print(dataname, use_vnor, use_vtex)
-            create_mesh(new_objects,
-                        use_edges,
-                        verts_loc_split,
-                        verts_nor if use_vnor else [],
-                        verts_tex if use_vtex else [],
-                        faces_split,
-                        unique_materials_split,
-                        unique_material_images,
-                        unique_smooth_groups,
-                        vertex_groups,
-                        dataname,
-                        )
-
-        # nurbs support
-        for context_nurbs in nurbs:
-            create_nurbs(context_nurbs, verts_loc, new_objects)
-
-        # Create new obj
-        for obj in new_objects:
-            base = scene.objects.link(obj)
-            base.select = True
+        progress.enter_substeps(3, "Parsing OBJ file...")
+        parse_options = dict(use_smooth_groups=use_smooth_groups,
+                             use_edges=use_edges,
+                             use_split_objects=use_split_objects,
+                             use_split_groups=use_split_groups,
+                             use_groups_as_vgroups=use_groups_as_vgroups,
+                             )
+
+        if use_streaming:
+            # Materials (and whether the file has smooth groups) are needed as soon as the first object is parsed.
+            with profile.phase("parse"):
+                material_libs, unique_materials, unique_smooth_groups, comma_decimal = scan_obj_materials(filepath)
+            if not use_smooth_groups:
+                unique_smooth_groups = {}
+            float_func = float_comma if comma_decimal else float
+
+            progress.step("Done, loading materials and images...")
+
+            if not use_lazy_materials:
+                with profile.phase("materials"):
+                    create_materials(filepath, relpath, material_libs, unique_materials,
+                                     unique_material_images, use_image_search, use_cycles,
+                                     float_func, profile, context_imagepath_map, use_material_reuse)
+
+            progress.step("Done, parsing and building geometries one object at a time...")
+
+            nbr_streamed = [0]  # objects built while parsing
+
+            def build_object_meshes(parsed):
+                nbr_streamed[0] += 1
+                build_meshes(parsed)
+
+            # Parsing and building meshes are interleaved here, so "parse" also holds the time of the latter.
+            with profile.phase("parse"):
+                parsed = parse_obj(filepath, object_callback=build_object_meshes, use_spill=use_stream_spill,
+                                   use_bulk_parse=use_bulk_parse, **parse_options)
+            # Left without faces after the objects built so far, the last object would give a mesh of every
+            # vertex of the file, which a whole import (see split_mesh()) does not.
+            if len(parsed.faces) or not nbr_streamed[0]:
+                build_meshes(parsed)
 
-            # we could apply this anywhere before scaling.
-            obj.matrix_world = global_matrix
+        else:
+            with profile.phase("parse"):
+                parsed = None
+                if object_names is not None:
+                    obj_index = get_obj_index(filepath)
+                    parsed = parse_obj_objects(filepath, obj_index, object_names, use_bulk_parse=use_bulk_parse,
+                                               **parse_options)
+                elif use_parse_cache:
+                    cache_path = parse_cache_path(parse_cache_dir, filepath, parse_options)
+                    parsed = load_parse_cache(cache_path)
+                    if parsed is not None:
+                        print("\tRead parsed data from cache %r" % cache_path)
+
+                if parsed is None:
+                    parsed = parse_obj_file(filepath,
+                                            parse_workers=parse_workers if use_parallel_parse else 1,
+                                            use_bulk_parse=use_bulk_parse,
+                                            **parse_options)
+                    if use_parse_cache:
+                        try:
+                            save_parse_cache(cache_path, parsed, parse_cache_max_size)
+                        except OSError as e:
+                            print("\tCould not write parse cache %r (%s)" % (cache_path, e))
+            unique_materials = parsed.unique_materials
+            unique_smooth_groups = parsed.unique_smooth_groups
+            material_libs = parsed.material_libs
+            float_func = float_comma if parsed.comma_decimal else float
+
+            progress.step("Done, loading materials and images...")
+
+            if not use_lazy_materials:
+                with profile.phase("materials"):
+                    create_materials(filepath, relpath, material_libs, unique_materials,
+                                     unique_material_images, use_image_search, use_cycles,
+                                     float_func, profile, context_imagepath_map, use_material_reuse)
+
+            progress.step("Done, building geometries (verts:%i faces:%i materials: %i smoothgroups:%i) ..." %
+                          (len(parsed.verts_loc), len(parsed.faces), len(unique_materials),
+                           len(parsed.unique_smooth_groups)))
+
+            if use_point_cloud and not len(parsed.faces):
+                objects = []
+                verts_loc, verts_col, faces, _vertex_groups = cropped(parsed, True)
+                dataname = os.path.splitext(os.path.basename(filepath))[0]
+                with profile.phase("points"):
+                    verts_loc, verts_col = downsample_points(verts_loc, verts_col,
+                                                             point_cloud_step, point_cloud_voxel_size)
+                profile.count("points", len(verts_loc))
+                chunks = [(verts_loc, verts_col, faces, {}, {}, dataname)]
+                if chunk_max_verts and len(verts_loc) > chunk_max_verts:
+                    with profile.phase("chunk"):
+                        chunks = chunk_mesh(verts_loc, verts_col, faces, {}, {}, dataname, chunk_max_verts)
+                    profile.count("chunks", len(chunks))
+                del verts_loc, verts_col
+
+                for verts_loc, verts_col, _faces, _materials, _vertex_groups, dataname in chunks:
+                    previous_ob = None
+                    if use_update:
+                        with profile.phase("update"):
+                            object_key, previous_ob = previous_object(dataname)
+                            object_hash = mesh_hash(verts_loc, (), (), verts_col, None, {}, (use_point_colors,))
+                    if previous_ob is not None and previous_ob.get(OBJECT_HASH_PROP) == object_hash:
+                        profile.count("unchanged_objects")
+                        continue
+                    with profile.phase("points"):
+                        create_point_cloud(objects, verts_loc, verts_col, dataname, use_point_colors)
+                    if use_update:
+                        update_object(objects, previous_ob, object_key, object_hash)
+                del chunks
+                link_objects(objects)
+            else:
+                build_meshes(parsed)
 
-        scene.update()
+        # nurbs support
+        objects = []
+        for context_nurbs in parsed.nurbs:
+            create_nurbs(context_nurbs, parsed.verts_loc, objects)
+        link_objects(objects)
+
+        # Objects of an earlier import no longer in the file, when all of it was imported
+        # (the others may only be left out by object_names or crop_box).
+        if object_names is None and crop_box is None:
+            for ob in previous_objects.values():
+                me = ob.data
+                bpy.data.objects.remove(ob, do_unlink=True)
+                if me is not None and not me.users:
+                    bpy.data.meshes.remove(me)
+                profile.count("removed_objects")
+        profile.count("vertices", len(parsed.verts_loc))
+        profile.count("colored_vertices", len(parsed.verts_col))
+        profile.count("objects", len(new_objects))
+        del parsed
+
+        with profile.phase("scene_update"):
+            scene.update()
 
         axis_min = [1000000000] * 3
         axis_max = [-1000000000] * 3
@@ -1359,6 +3440,8 @@ def load(context,
             # Get all object bounds
             for ob in new_objects:
                 for v in ob.bound_box:
+                    if use_mesh_dedup:
+                        v = ob.matrix_world * mathutils.Vector(v)
                     for axis, value in enumerate(v):
                         if axis_min[axis] > value:
                             axis_min[axis] = value
@@ -1374,8 +3457,14 @@ def load(context,
 
             for obj in new_objects:
                 obj.scale = scale, scale, scale
+                if use_mesh_dedup:
+                    obj.location = obj.location * scale
 
         progress.leave_substeps("Done.")
         progress.leave_substeps("Finished importing: %r" % filepath)
 
+    print("finished importing: %r in %.4f sec." % (filepath, profile.phases["import"]["time"]))
+    if profile_log is not None:
+        profile.write_log(profile_log)
+
     return {'FINISHED'}